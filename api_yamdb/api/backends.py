@@ -3,6 +3,7 @@ from django.conf import settings
 from rest_framework import authentication, exceptions
 
 from reviews.models import User
+from users.usercache import user_cache
 
 
 class JWTAuthentication(authentication.BaseAuthentication):
@@ -40,11 +41,14 @@ class JWTAuthentication(authentication.BaseAuthentication):
             msg = 'Invalid authentication. Could not decode token.'
             raise exceptions.AuthenticationFailed(msg)
 
-        try:
-            user = User.objects.get(pk=payload['user_id'])
-        except User.DoesNotExist:
-            msg = 'No user matching this token was found.'
-            raise exceptions.AuthenticationFailed(msg)
+        user = user_cache.get(payload['user_id'])
+        if user is None:
+            try:
+                user = User.objects.get(pk=payload['user_id'])
+            except User.DoesNotExist:
+                msg = 'No user matching this token was found.'
+                raise exceptions.AuthenticationFailed(msg)
+            user_cache.set(user)
 
         if not user.is_active:
             msg = 'This user has been deactivated.'
@@ -0,0 +1,206 @@
+from django.db import connection, transaction
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+from reviews.leaderboards import refresh_titles
+from reviews.models import Category, Genre, Title, TitleGenre
+from .permissions import IsAdmin
+
+BULK_MAX_SIZE = 1000
+
+TITLE_FIELDS = ('name', 'year', 'description', 'category')
+
+
+def validate_items(serializer_class, data, max_size):
+    if not isinstance(data, list):
+        raise ValidationError('Ожидается список объектов')
+    if len(data) > max_size:
+        raise ValidationError(f'Не больше {max_size} объектов за запрос')
+    results, items = [], []
+    for index, item in enumerate(data):
+        serializer = serializer_class(data=item)
+        if serializer.is_valid():
+            results.append(None)
+            items.append((index, serializer.validated_data))
+        else:
+            results.append(item_error(serializer.errors))
+    return results, items
+
+
+def item_error(errors):
+    return {'status': 'error', 'errors': errors}
+
+
+def changed_fields(instance, values):
+    return [
+        name for name, value in values.items()
+        if getattr(instance, name) != value
+    ]
+
+
+def upsert_by_slug(model, items, results):
+    by_slug = {}
+    for index, data in items:
+        if data['slug'] in by_slug:
+            results[index] = item_error(
+                {'slug': ['slug повторяется в запросе']}
+            )
+        else:
+            by_slug[data['slug']] = (index, data)
+    existing = model.objects.in_bulk(list(by_slug), field_name='slug')
+    to_create, to_update = [], []
+    for slug, (index, data) in by_slug.items():
+        instance = existing.get(slug)
+        if instance is None:
+            to_create.append(model(**data))
+            status = 'created'
+        elif changed_fields(instance, data):
+            instance.name = data['name']
+            to_update.append(instance)
+            status = 'updated'
+        else:
+            status = 'unchanged'
+        results[index] = {'slug': slug, 'status': status}
+    # Строки, вставленные параллельным запросом, пропускаются.
+    model.objects.bulk_create(to_create, ignore_conflicts=True)
+    if to_create:
+        to_update += overwrite_concurrent(model, to_create, by_slug, results)
+    model.objects.bulk_update(to_update, ['name'])
+
+
+def overwrite_concurrent(model, created, by_slug, results):
+    """Строки, которые вставил параллельный запрос, обновляются
+    значениями из пакета и отмечаются как updated."""
+    stored = model.objects.in_bulk(
+        [instance.slug for instance in created], field_name='slug'
+    )
+    overwritten = []
+    for instance in created:
+        current = stored[instance.slug]
+        if current.name != instance.name:
+            current.name = instance.name
+            overwritten.append(current)
+            index = by_slug[instance.slug][0]
+            results[index] = {'slug': instance.slug, 'status': 'updated'}
+    return overwritten
+
+
+def fetch_title_refs(items):
+    categories = Category.objects.in_bulk(
+        {data['category'] for index, data in items}, field_name='slug'
+    )
+    genres = Genre.objects.in_bulk(
+        {slug for index, data in items for slug in data['genre']},
+        field_name='slug',
+    )
+    existing = Title.objects.defer('search_vector').prefetch_related(
+        'genre'
+    ).in_bulk({data['id'] for index, data in items if 'id' in data})
+    return categories, genres, existing
+
+
+def resolve_title(data, categories, genres, existing):
+    errors = {}
+    if data['category'] not in categories:
+        errors['category'] = [f'Категория {data["category"]} не найдена']
+    unknown = [slug for slug in data['genre'] if slug not in genres]
+    if unknown:
+        errors['genre'] = [f'Жанры не найдены: {", ".join(unknown)}']
+    title = Title()
+    if 'id' in data:
+        title = existing.pop(data['id'], None)
+        if title is None:
+            errors['id'] = [
+                f'Произведение {data["id"]} не найдено '
+                f'или повторяется в запросе'
+            ]
+    if errors:
+        raise ValidationError(errors)
+    return title
+
+
+def update_title(title, data, categories):
+    values = {
+        'name': data['name'],
+        'year': data['year'],
+        'description': data.get('description', title.description),
+        'category_id': categories[data['category']].id,
+    }
+    changed = changed_fields(title, values)
+    for name, value in values.items():
+        setattr(title, name, value)
+    return bool(changed)
+
+
+def create_titles(titles):
+    if connection.features.can_return_rows_from_bulk_insert:
+        Title.objects.bulk_create(titles)
+        return
+    # Без RETURNING bulk_create не заполнит первичные ключи.
+    for title in titles:
+        title.save()
+
+
+def upsert_titles(items, results):
+    """Создаёт и обновляет произведения, возвращает id изменённых."""
+    categories, genres, existing = fetch_title_refs(items)
+    created, updated, relinked, links = [], [], [], []
+    for index, data in items:
+        try:
+            title = resolve_title(data, categories, genres, existing)
+        except ValidationError as error:
+            results[index] = item_error(error.detail)
+            continue
+        genre_ids = {genres[slug].id for slug in data['genre']}
+        if title.pk is None:
+            update_title(title, data, categories)
+            created.append((index, title))
+            links.append((title, genre_ids))
+            continue
+        status = 'unchanged'
+        if update_title(title, data, categories):
+            updated.append(title)
+            status = 'updated'
+        if genre_ids != {genre.id for genre in title.genre.all()}:
+            relinked.append(title.pk)
+            links.append((title, genre_ids))
+            status = 'updated'
+        results[index] = {'id': title.pk, 'status': status}
+    create_titles([title for index, title in created])
+    for index, title in created:
+        results[index] = {'id': title.pk, 'status': 'created'}
+    Title.objects.bulk_update(updated, TITLE_FIELDS)
+    TitleGenre.objects.filter(title_id__in=relinked).delete()
+    TitleGenre.objects.bulk_create([
+        TitleGenre(title=title, genre_id=genre_id)
+        for title, genre_ids in links
+        for genre_id in genre_ids
+    ])
+    changed = {title.pk for title in updated} | set(relinked)
+    # bulk_update и вставка TitleGenre не вызывают сигналы.
+    refresh_titles(changed)
+    return changed
+
+
+class BulkUpsertMixin:
+    """POST .../bulk/ со списком объектов: создание или обновление
+    одной транзакцией, ошибки отдельных объектов возвращаются в ответе
+    на их позициях и не прерывают остальные."""
+
+    bulk_serializer_class = None
+    bulk_max_size = BULK_MAX_SIZE
+
+    @action(detail=False, methods=['post'], permission_classes=(IsAdmin,))
+    def bulk(self, request):
+        results, items = validate_items(
+            self.bulk_serializer_class,
+            request.data,
+            self.bulk_max_size,
+        )
+        with transaction.atomic():
+            self.perform_bulk_upsert(items, results)
+        return Response(results)
+
+    def perform_bulk_upsert(self, items, results):
+        upsert_by_slug(self.queryset.model, items, results)
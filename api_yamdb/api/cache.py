@@ -0,0 +1,166 @@
+import hashlib
+import time
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from rest_framework import permissions
+from rest_framework.response import Response
+
+VERSION_KEY = 'api:version:{}'
+MODIFIED_KEY = 'api:modified:{}'
+RESPONSE_KEY = 'api:response:{}'
+
+# От этого ресурса зависит любой кэшируемый ответ: его меняют команды,
+# которые правят данные пачками, мимо сигналов моделей.
+ALL_RESOURCE = 'all'
+
+
+def now_ms():
+    return int(time.time() * 1000)
+
+
+def get_versions(resources):
+    version_keys = [VERSION_KEY.format(resource) for resource in resources]
+    modified_keys = [MODIFIED_KEY.format(resource) for resource in resources]
+    values = cache.get_many(version_keys + modified_keys)
+    for version_key, modified_key in zip(version_keys, modified_keys):
+        if version_key not in values:
+            cache.add(
+                version_key, now_ms(), settings.API_CACHE_VERSION_TIMEOUT
+            )
+            values[version_key] = cache.get(version_key)
+        if modified_key not in values:
+            cache.add(
+                modified_key,
+                int(time.time()),
+                settings.API_CACHE_VERSION_TIMEOUT,
+            )
+            values[modified_key] = cache.get(modified_key)
+    versions = [values[key] for key in version_keys]
+    return versions, max(values[key] for key in modified_keys)
+
+
+def bump_versions(resources):
+    modified = int(time.time())
+    for resource in resources:
+        key = VERSION_KEY.format(resource)
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Новая отметка времени больше любой ранее выданной версии.
+            cache.add(key, now_ms(), settings.API_CACHE_VERSION_TIMEOUT)
+        cache.set(
+            MODIFIED_KEY.format(resource),
+            modified,
+            settings.API_CACHE_VERSION_TIMEOUT,
+        )
+
+
+def invalidate(resources):
+    bump_versions(resources)
+    if transaction.get_connection().in_atomic_block:
+        # Повторно после фиксации, чтобы не оставить в кэше ответ,
+        # прочитанный до неё.
+        transaction.on_commit(lambda: bump_versions(resources))
+
+
+def invalidate_all():
+    invalidate((ALL_RESOURCE,))
+
+
+def format_resources(templates, kwargs):
+    resources = []
+    for template in templates:
+        try:
+            resources.append(template.format(**kwargs))
+        except KeyError:
+            continue
+    return resources
+
+
+class CachedListMixin:
+    # Ресурсы, от которых зависит ответ, по действиям; в шаблонах
+    # доступны kwargs из URL.
+    cache_resources = {}
+    # Ресурсы, версии которых меняются после успешной записи.
+    invalidates = ()
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def get_cache_resources(self):
+        resources = format_resources(
+            self.cache_resources.get(self.action, ()),
+            self.kwargs,
+        )
+        return resources + [ALL_RESOURCE] if resources else resources
+
+    def get_digest(self, request, versions):
+        query = urlencode(sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+        ))
+        raw = '|'.join((
+            request.build_absolute_uri(request.path),
+            query,
+            request.accepted_renderer.format,
+            ','.join(str(version) for version in versions),
+        ))
+        return hashlib.md5(raw.encode()).hexdigest()
+
+    def cached(self, handler, request, *args, **kwargs):
+        resources = self.get_cache_resources()
+        if not resources or request.method not in ('GET', 'HEAD'):
+            return handler(request, *args, **kwargs)
+        versions, modified = get_versions(resources)
+        digest = self.get_digest(request, versions)
+        etag = f'"{digest}"'
+        response = get_conditional_response(
+            request._request,
+            etag=etag,
+            last_modified=modified,
+        )
+        if response is None:
+            response = self.get_cached_response(
+                handler, request, digest, *args, **kwargs
+            )
+        if response.status_code in (200, 304):
+            response['ETag'] = etag
+            response['Last-Modified'] = http_date(modified)
+        return response
+
+    def get_cached_response(self, handler, request, digest, *args, **kwargs):
+        if request.user.is_authenticated:
+            return handler(request, *args, **kwargs)
+        key = RESPONSE_KEY.format(digest)
+        data = cache.get(key)
+        if data is not None:
+            return Response(data)
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            cache.set(key, response.data, settings.API_CACHE_TIMEOUT)
+        return response
+
+    def get_invalidated_resources(self):
+        return format_resources(self.invalidates, self.kwargs)
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        if (
+            request.method not in permissions.SAFE_METHODS
+            and response.status_code < 400
+        ):
+            invalidate(self.get_invalidated_resources())
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class CachedResponseMixin(CachedListMixin):
+    # Только для вьюсетов с retrieve: роутер добавляет маршрут по
+    # наличию метода.
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
@@ -0,0 +1,93 @@
+from django.db import models
+from rest_framework import serializers
+from rest_framework.fields import SkipField
+from rest_framework.relations import PKOnlyObject
+
+# Поля, у которых to_representation сводится к приведению типа.
+CONVERTERS = {
+    serializers.CharField: str,
+    serializers.IntegerField: int,
+}
+
+
+def compile_plan(serializer):
+    """Список (имя поля, функция объект -> значение) для чтения."""
+    return [
+        (field.field_name, compile_field(field))
+        for field in serializer._readable_fields
+    ]
+
+
+def compile_field(field):
+    if field.source == '*' or len(field.source_attrs) != 1:
+        return generic_getter(field)
+    attr = field.source_attrs[0]
+    if type(field) in CONVERTERS:
+        return attribute_getter(attr, CONVERTERS[type(field)])
+    if type(field) is serializers.DateTimeField:
+        return attribute_getter(attr, field.to_representation)
+    if type(field) is serializers.SlugRelatedField:
+        slug_field = field.slug_field
+        return attribute_getter(
+            attr, lambda value: getattr(value, slug_field)
+        )
+    if isinstance(field, serializers.ManyRelatedField):
+        child = compile_nested(field.child_relation)
+        if child is not None:
+            return lambda instance: [
+                child(item) for item in getattr(instance, attr).all()
+            ]
+    nested = compile_nested(field)
+    if nested is not None:
+        return attribute_getter(attr, nested)
+    return generic_getter(field)
+
+
+def compile_nested(field):
+    # Поля, отдающие объект через вложенный сериализатор.
+    serializer_class = getattr(field, 'serializer_class', None)
+    if serializer_class is None:
+        return None
+    plan = compile_plan(serializer_class())
+    return lambda value: represent(plan, value)
+
+
+def represent(plan, instance):
+    ret = {}
+    for name, getter in plan:
+        try:
+            ret[name] = getter(instance)
+        except SkipField:
+            continue
+    return ret
+
+
+def attribute_getter(attr, convert):
+    def getter(instance):
+        value = getattr(instance, attr)
+        return None if value is None else convert(value)
+    return getter
+
+
+def generic_getter(field):
+    # Повторяет Serializer.to_representation для одного поля.
+    def getter(instance):
+        attribute = field.get_attribute(instance)
+        if isinstance(attribute, PKOnlyObject):
+            check_for_none = attribute.pk
+        else:
+            check_for_none = attribute
+        if check_for_none is None:
+            return None
+        return field.to_representation(attribute)
+    return getter
+
+
+class FastListSerializer(serializers.ListSerializer):
+    """Чтение списка по заранее собранному плану полей дочернего
+    сериализатора, без обхода полей DRF для каждого объекта."""
+
+    def to_representation(self, data):
+        plan = compile_plan(self.child)
+        iterable = data.all() if isinstance(data, models.Manager) else data
+        return [represent(plan, item) for item in iterable]
@@ -10,11 +10,12 @@ class TitleFilter(filters.FilterSet):
     )
     category = filters.CharFilter(
         field_name='category__slug',
-        lookup_expr='icontains',
     )
     genre = filters.CharFilter(
         field_name='genre__slug',
-        lookup_expr='icontains',
+    )
+    search = filters.CharFilter(
+        method='filter_search',
     )
 
     class Meta:
@@ -24,4 +25,8 @@ class TitleFilter(filters.FilterSet):
             'year',
             'genre',
             'category',
+            'search',
         ]
+
+    def filter_search(self, queryset, name, value):
+        return queryset.search(value)
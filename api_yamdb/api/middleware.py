@@ -0,0 +1,166 @@
+import json
+import logging
+from contextlib import ExitStack
+from time import perf_counter
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+logger = logging.getLogger('api.profiling')
+
+
+def milliseconds(seconds):
+    return round(seconds * 1000, 2)
+
+
+class QueryTimer:
+    """execute_wrapper: считает запросы и время в базе."""
+
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.duration += perf_counter() - start
+            self.count += 1
+
+
+class RequestProfile:
+    """Отметки времени одного запроса.
+
+    view — время от входа во вьюху до готового Response без запросов
+    к базе: для API это в основном сериализация. render — рендеринг
+    ответа, для DRF это вызов рендерера.
+    """
+
+    def __init__(self):
+        self.queries = QueryTimer()
+        self.start = perf_counter()
+        self.view_start = self.view_end = self.render_end = None
+        self.view_queries = 0.0
+
+    def start_view(self):
+        self.view_start = perf_counter()
+        self.view_queries = self.queries.duration
+
+    def end_view(self):
+        self.view_end = perf_counter()
+        self.view_queries = self.queries.duration - self.view_queries
+
+    def end_render(self):
+        self.render_end = perf_counter()
+
+    def timings(self, end):
+        if self.view_start is not None and self.view_end is None:
+            # Вьюха вернула готовый HttpResponse, рендеринга не было.
+            self.end_view()
+        timings = {
+            'db': self.queries.duration,
+            'view': 0.0,
+            'render': 0.0,
+            'total': end - self.start,
+        }
+        if self.view_start is not None:
+            timings['view'] = max(
+                self.view_end - self.view_start - self.view_queries, 0.0
+            )
+        if self.render_end is not None:
+            timings['render'] = self.render_end - self.view_end
+        return timings
+
+
+def server_timing(timings, queries):
+    metrics = []
+    for name, seconds in timings.items():
+        metric = f'{name};dur={milliseconds(seconds)}'
+        if name == 'db':
+            metric += f';desc="{queries} queries"'
+        metrics.append(metric)
+    return ', '.join(metrics)
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else None
+
+
+def response_size(response):
+    if response.streaming:
+        return None
+    return len(response.content)
+
+
+class ProfilingMiddleware:
+    """Количество запросов к базе и время по фазам для каждого запроса.
+
+    Включается API_PROFILING['ENABLED']; выключенный middleware Django
+    убирает из цепочки при загрузке. Результат отдаётся в заголовке
+    Server-Timing и строкой JSON в логгер api.profiling, запросы сверх
+    бюджета пишутся с уровнем WARNING. Для потоковых ответов запросы,
+    выполненные при чтении тела, не учитываются.
+    """
+
+    def __init__(self, get_response):
+        config = settings.API_PROFILING
+        if not config['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.query_budget = config['QUERY_BUDGET']
+        self.budgets = config['BUDGETS']
+        self.header = config['HEADER']
+
+    def __call__(self, request):
+        profile = request._profile = RequestProfile()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(
+                    connection.execute_wrapper(profile.queries)
+                )
+            response = self.get_response(request)
+        self.report(request, response, profile)
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        request._profile.start_view()
+
+    def process_template_response(self, request, response):
+        request._profile.end_view()
+        response.add_post_render_callback(
+            lambda response: request._profile.end_render()
+        )
+        return response
+
+    def get_budget(self, name):
+        return self.budgets.get(name, self.query_budget)
+
+    def report(self, request, response, profile):
+        timings = profile.timings(perf_counter())
+        queries = profile.queries.count
+        name = view_name(request)
+        budget = self.get_budget(name)
+        over_budget = budget is not None and queries > budget
+        if self.header:
+            response['Server-Timing'] = server_timing(timings, queries)
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'view': name,
+            'status': response.status_code,
+            'queries': queries,
+            'query_budget': budget,
+            'over_budget': over_budget,
+            'size': response_size(response),
+        }
+        record.update(
+            (f'{phase}_ms', milliseconds(seconds))
+            for phase, seconds in timings.items()
+        )
+        logger.log(
+            logging.WARNING if over_budget else logging.INFO,
+            json.dumps(record, ensure_ascii=False),
+        )
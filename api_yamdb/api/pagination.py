@@ -0,0 +1,151 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(LimitOffsetPagination):
+    """LimitOffset по умолчанию, keyset-страницы при наличии ?cursor=."""
+
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Некорректный курсор.'
+    keyset_ordering = ('id',)
+    # Всегда keyset-страницы, без запроса количества.
+    keyset_only = False
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.view = view
+        self.keyset = (
+            self.keyset_only
+            or self.cursor_query_param in request.query_params
+        )
+        if not self.keyset:
+            return super().paginate_queryset(queryset, request, view)
+        self.request = request
+        self.limit = self.get_limit(request)
+        position, reverse = self.decode_cursor(request)
+        ordering = self.keyset_ordering
+        if reverse:
+            ordering = [self.reverse_field(field) for field in ordering]
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            try:
+                queryset = queryset.filter(self.after(position, reverse))
+            except (TypeError, ValueError, ValidationError):
+                # Значения курсора не подходят к типам полей сортировки.
+                raise NotFound(self.invalid_cursor_message)
+        results = list(queryset[:self.limit + 1])
+        has_more = len(results) > self.limit
+        results = results[:self.limit]
+        if reverse:
+            results.reverse()
+        first = self.get_position(results[0]) if results else None
+        last = self.get_position(results[-1]) if results else None
+        if reverse:
+            self.previous_position = first if has_more else None
+            self.next_position = last or position
+        else:
+            self.next_position = last if has_more else None
+            self.previous_position = position and (first or position)
+        return results
+
+    def get_count(self, queryset):
+        # Вьюха может взять количество из счётчика вместо COUNT(*).
+        get_list_count = getattr(self.view, 'get_list_count', None)
+        count = get_list_count() if get_list_count else None
+        if count is None:
+            return super().get_count(queryset)
+        return count
+
+    def get_paginated_response(self, data):
+        if not self.keyset:
+            return super().get_paginated_response(data)
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('previous', self.get_previous_link()),
+            ('results', data),
+        ]))
+
+    def get_next_link(self):
+        if not self.keyset:
+            return super().get_next_link()
+        return self.encode_link(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if not self.keyset:
+            return super().get_previous_link()
+        return self.encode_link(self.previous_position, reverse=True)
+
+    def after(self, position, reverse):
+        condition = Q()
+        for index, field in enumerate(self.keyset_ordering):
+            descending = field.startswith('-') != reverse
+            lookup = 'lt' if descending else 'gt'
+            term = Q(**{f'{field.lstrip("-")}__{lookup}': position[index]})
+            for previous, value in zip(self.keyset_ordering[:index], position):
+                term &= Q(**{previous.lstrip('-'): value})
+            condition |= term
+        return condition
+
+    def get_position(self, item):
+        position = []
+        for field in self.keyset_ordering:
+            value = getattr(item, field.lstrip('-'))
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            position.append(value)
+        return position
+
+    def reverse_field(self, field):
+        if field.startswith('-'):
+            return field[1:]
+        return f'-{field}'
+
+    def encode_link(self, position, reverse):
+        if position is None:
+            return None
+        cursor = json.dumps({'p': position, 'r': reverse})
+        encoded = urlsafe_b64encode(cursor.encode()).decode()
+        url = self.request.build_absolute_uri()
+        url = remove_query_param(url, self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            cursor = json.loads(urlsafe_b64decode(encoded.encode()))
+            position, reverse = cursor['p'], bool(cursor['r'])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        if (
+            not isinstance(position, list)
+            or len(position) != len(self.keyset_ordering)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+
+class PubDatePagination(KeysetPagination):
+    keyset_ordering = ('pub_date', 'id')
+
+
+class YearPagination(KeysetPagination):
+    keyset_ordering = ('-year', 'id')
+
+
+class RatingRankPagination(KeysetPagination):
+    keyset_ordering = ('-rating', '-reviews_count', 'title_id')
+    keyset_only = True
+
+
+class ReviewsRankPagination(KeysetPagination):
+    keyset_ordering = ('-reviews_count', 'title_id')
+    keyset_only = True
@@ -1,42 +1,52 @@
 from rest_framework import permissions
 
+from users.models import ADMIN, MODERATOR, SUPERUSER
+
+STAFF_ROLES = (SUPERUSER, ADMIN, MODERATOR)
+
+
+def get_role(request):
+    if not hasattr(request, '_role'):
+        user = request.user
+        request._role = user.role if user.is_authenticated else None
+    return request._role
+
+
+def is_author(request, obj):
+    return obj.author_id == request.user.pk
+
 
 class IsSuperuser(permissions.BasePermission):
 
     def has_permission(self, request, view):
-        if request.user.is_authenticated:
-            return request.user.is_superuser
+        return get_role(request) == SUPERUSER
 
     def has_object_permission(self, request, view, obj):
-        if request.user.is_authenticated:
-            return request.user.is_superuser
+        return get_role(request) == SUPERUSER
 
 
 class IsAdmin(permissions.BasePermission):
     def has_permission(self, request, view):
-        if request.user.is_authenticated:
-            return request.user.is_administrator
+        return get_role(request) == ADMIN
 
     def has_object_permission(self, request, view, obj):
-        if request.user.is_authenticated:
-            return request.user.is_administrator
+        return get_role(request) == ADMIN
 
 
 class IsModerator(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated
+        return get_role(request) is not None
 
     def has_object_permission(self, request, view, obj):
-        if request.user.is_authenticated:
-            return request.user.is_moderator
+        return get_role(request) == MODERATOR
 
 
 class IsUser(permissions.BasePermission):
     def has_permission(self, request, view):
-        return request.user.is_authenticated
+        return get_role(request) is not None
 
     def has_object_permission(self, request, view, obj):
-        return obj.author == request.user
+        return is_author(request, obj)
 
 
 class ReadOnly(permissions.BasePermission):
@@ -45,3 +55,21 @@ class ReadOnly(permissions.BasePermission):
 
     def has_object_permission(self, request, view, obj):
         return request.method in permissions.SAFE_METHODS
+
+
+class IsAuthorOrStaffOrReadOnly(permissions.BasePermission):
+    """ReadOnly | IsSuperuser | IsAdmin | IsModerator | IsUser без OR."""
+
+    def has_permission(self, request, view):
+        return (
+            request.method in permissions.SAFE_METHODS
+            or get_role(request) is not None
+        )
+
+    def has_object_permission(self, request, view, obj):
+        if request.method in permissions.SAFE_METHODS:
+            return True
+        role = get_role(request)
+        return role in STAFF_ROLES or (
+            role is not None and is_author(request, obj)
+        )
@@ -3,6 +3,8 @@ from rest_framework import serializers
 
 from reviews.models import Category, Comment, Genre, Review, Title
 from users.models import ROLE_CHOICES, User
+from .fastpath import FastListSerializer
+from .sparse import SparseFieldsSerializerMixin
 
 
 class UserSerializer(serializers.ModelSerializer):
@@ -27,18 +29,10 @@ class UserSerializer(serializers.ModelSerializer):
             'role',
         )
         model = User
+        validators = []
 
     def validate(self, data):
-        email = data.get('email')
         username = data.get('username')
-        if (
-            User.objects.filter(email=email).exists()
-            or User.objects.filter(username=username).exists()
-        ):
-            raise serializers.ValidationError(
-                'А Вы точно зедсь первый раз?!'
-                'Я точно помню, что такие username и/или email уже видел :)'
-            )
         if username is not None and username.lower() == 'me':
             raise serializers.ValidationError(
                 f'username {username} зарезервировано!'
@@ -71,6 +65,7 @@ class MeSerializer(serializers.ModelSerializer):
             'role',
         )
         model = User
+        validators = []
 
 
 class SignUpSerializer(serializers.Serializer):
@@ -83,17 +78,7 @@ class SignUpSerializer(serializers.Serializer):
     email = serializers.EmailField(max_length=254)
 
     def validate(self, data):
-        email = data.get('email')
         username = data.get('username')
-        if not User.objects.filter(username=username, email=email).exists():
-            if (
-                User.objects.filter(email=email).exists()
-                or User.objects.filter(username=username).exists()
-            ):
-                raise serializers.ValidationError(
-                    'А Вы точно зедсь первый раз?!'
-                    'Я точно помню, что такие username и/или email уже видел!'
-                )
         if username is not None and username.lower() == 'me':
             raise serializers.ValidationError(
                 f'username {username} зарезервировано!'
@@ -133,7 +118,20 @@ class TokenSerializer(serializers.ModelSerializer):
         return data
 
 
-class CategorySerializer(serializers.ModelSerializer):
+# Адреса действий со списком, например categories/bulk/, перекрывают
+# страницу объекта с таким slug.
+RESERVED_SLUGS = ('bulk',)
+
+
+class ReservedSlugMixin:
+
+    def validate_slug(self, slug):
+        if slug in RESERVED_SLUGS:
+            raise serializers.ValidationError(f'slug {slug} зарезервирован!')
+        return slug
+
+
+class CategorySerializer(ReservedSlugMixin, serializers.ModelSerializer):
     lookup_field = 'slug'
 
     class Meta:
@@ -141,7 +139,7 @@ class CategorySerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
-class GenreSerializer(serializers.ModelSerializer):
+class GenreSerializer(ReservedSlugMixin, serializers.ModelSerializer):
     lookup_field = 'slug'
 
     class Meta:
@@ -149,17 +147,40 @@ class GenreSerializer(serializers.ModelSerializer):
         fields = ('name', 'slug')
 
 
+class CategoryBulkSerializer(ReservedSlugMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Category
+        fields = ('name', 'slug')
+        # Уникальность slug проверяется одним запросом на весь пакет.
+        extra_kwargs = {'slug': {'validators': []}}
+
+
+class GenreBulkSerializer(ReservedSlugMixin, serializers.ModelSerializer):
+
+    class Meta:
+        model = Genre
+        fields = ('name', 'slug')
+        extra_kwargs = {'slug': {'validators': []}}
+
+
 class CategoryListField(serializers.SlugRelatedField):
+    serializer_class = CategorySerializer
+
     def to_representation(self, value):
-        return CategorySerializer(value).data
+        return self.serializer_class(value).data
 
 
 class GenreListField(serializers.SlugRelatedField):
+    serializer_class = GenreSerializer
+
     def to_representation(self, value):
-        return GenreSerializer(value).data
+        return self.serializer_class(value).data
 
 
-class TitleSerializer(serializers.ModelSerializer):
+class TitleSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     genre = GenreListField(
         slug_field='slug',
         queryset=Genre.objects.all(),
@@ -173,16 +194,57 @@ class TitleSerializer(serializers.ModelSerializer):
         required=False,
     )
     rating = serializers.IntegerField(
-        source='reviews__score__avg',
+        read_only=True,
+    )
+    reviews_count = serializers.IntegerField(
+        source='rating_count',
         read_only=True,
     )
 
     class Meta:
         model = Title
-        fields = '__all__'
+        fields = (
+            'id',
+            'genre',
+            'category',
+            'description',
+            'rating',
+            'reviews_count',
+            'name',
+            'year',
+        )
+        list_serializer_class = FastListSerializer
+
+
+class TitleBulkSerializer(serializers.ModelSerializer):
+    id = serializers.IntegerField(
+        required=False,
+    )
+    genre = serializers.ListField(
+        child=serializers.SlugField(max_length=50),
+    )
+    category = serializers.SlugField(
+        max_length=50,
+    )
+    description = serializers.CharField(
+        required=False,
+    )
+
+    class Meta:
+        model = Title
+        fields = (
+            'id',
+            'name',
+            'year',
+            'description',
+            'category',
+            'genre',
+        )
 
 
-class ReviewSerializer(serializers.ModelSerializer):
+class ReviewSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     title = serializers.SlugRelatedField(
         slug_field='name',
         read_only=True,
@@ -196,20 +258,12 @@ class ReviewSerializer(serializers.ModelSerializer):
         fields = '__all__'
         model = Review
         read_field_only = ('title',)
-
-    def validate(self, data):
-        if self.context['request'].method == 'POST':
-            if Review.objects.filter(
-                author=self.context['request'].user,
-                title=self.context['view'].kwargs.get('title_id'),
-            ).exists():
-                raise serializers.ValidationError(
-                    'Нельзя оставить повторный отзыв на одно произведение'
-                )
-        return data
+        list_serializer_class = FastListSerializer
 
 
-class CommentSerializer(serializers.ModelSerializer):
+class CommentSerializer(
+    SparseFieldsSerializerMixin, serializers.ModelSerializer
+):
     author = serializers.SlugRelatedField(
         read_only=True, slug_field='username'
     )
@@ -223,3 +277,4 @@ class CommentSerializer(serializers.ModelSerializer):
         )
         model = Comment
         read_only_fields = ('review',)
+        list_serializer_class = FastListSerializer
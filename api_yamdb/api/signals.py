@@ -0,0 +1,81 @@
+"""Версии кэша ответов при изменениях мимо вьюсетов API: через админку,
+shell и сигналы. QuerySet.update() и bulk_create() сигналов не
+отправляют, после них нужен invalidate_all().
+"""
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from reviews.models import Category, Comment, Genre, Review, Title
+from users.models import User
+
+from .cache import invalidate
+
+
+def title_resources(title_id):
+    return ['titles', f'title:{title_id}', f'reviews:{title_id}']
+
+
+@receiver((post_save, post_delete), sender=Title)
+def title_changed(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate(title_resources(instance.pk))
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    title_ids = (pk_set or ()) if reverse else [instance.pk]
+    invalidate(['titles'] + [f'title:{pk}' for pk in title_ids])
+
+
+@receiver((post_save, post_delete), sender=Category)
+def category_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate(('categories',))
+
+
+@receiver((post_save, post_delete), sender=Genre)
+def genre_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate(('genres',))
+
+
+@receiver((post_save, post_delete), sender=User)
+def user_changed(sender, raw=False, **kwargs):
+    if not raw:
+        invalidate(('users',))
+
+
+@receiver((post_save, post_delete), sender=Review)
+def review_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    resources = title_resources(instance.title_id)
+    resources.append(f'comments:{instance.pk}')
+    # Отзыв мог перейти к другому произведению. Приложение api стоит в
+    # INSTALLED_APPS раньше reviews, и этот обработчик видит прежнее
+    # произведение до того, как reviews.signals его перезапишет.
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    if old_title_id not in (None, instance.title_id):
+        resources.extend(title_resources(old_title_id))
+    invalidate(resources)
+
+
+@receiver((post_save, post_delete), sender=Comment)
+def comment_changed(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    resources = [f'comments:{instance.review_id}']
+    review = Comment.review.field.get_cached_value(instance, None)
+    if review is not None:
+        title_id = review.title_id
+    else:
+        title_id = Review.objects.filter(
+            pk=instance.review_id
+        ).values_list('title_id', flat=True).first()
+    if title_id is not None:
+        # comments_count отзыва есть в ответах отзывов.
+        resources.append(f'reviews:{title_id}')
+    invalidate(resources)
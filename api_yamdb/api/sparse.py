@@ -0,0 +1,82 @@
+from collections import OrderedDict
+
+from rest_framework import permissions
+from rest_framework.exceptions import ValidationError
+
+
+class SparseFieldsSerializerMixin:
+    """Оставляет только поля из context['fields'], если он задан."""
+
+    def get_fields(self):
+        fields = super().get_fields()
+        requested = self.context.get('fields')
+        if requested is None:
+            return fields
+        return OrderedDict(
+            (name, field) for name, field in fields.items()
+            if name in requested
+        )
+
+
+class SparseFieldsMixin:
+    """?fields=a,b при чтении: в ответе только перечисленные поля,
+    из базы загружаются только нужные для них колонки и связи."""
+
+    fields_query_param = 'fields'
+    # Поле сериализатора -> поля модели, которые нужны для него в only().
+    sparse_fields = {}
+    # Поле сериализатора -> связь для select_related/prefetch_related.
+    sparse_select = {}
+    sparse_prefetch = {}
+
+    def get_requested_fields(self):
+        if not hasattr(self, '_requested_fields'):
+            self._requested_fields = self.parse_requested_fields()
+        return self._requested_fields
+
+    def parse_requested_fields(self):
+        value = self.request.query_params.get(self.fields_query_param)
+        if not value or self.request.method not in permissions.SAFE_METHODS:
+            return None
+        requested = {name.strip() for name in value.split(',')} - {''}
+        unknown = requested - set(self.sparse_fields)
+        if unknown:
+            raise ValidationError({
+                self.fields_query_param:
+                    f'Неизвестные поля: {", ".join(sorted(unknown))}'
+            })
+        return requested
+
+    def is_requested(self, name):
+        requested = self.get_requested_fields()
+        return requested is None or name in requested
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['fields'] = self.get_requested_fields()
+        return context
+
+    def get_sparse_queryset(self, queryset):
+        select = [
+            relation for name, relation in self.sparse_select.items()
+            if self.is_requested(name)
+        ]
+        prefetch = [
+            relation for name, relation in self.sparse_prefetch.items()
+            if self.is_requested(name)
+        ]
+        if select:
+            queryset = queryset.select_related(*select)
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        requested = self.get_requested_fields()
+        if requested is None:
+            return queryset
+        # Поля keyset-пагинации читаются с объектов страницы.
+        only = {'id'} | {
+            field.lstrip('-')
+            for field in getattr(self.paginator, 'keyset_ordering', ())
+        }
+        for name in requested:
+            only.update(self.sparse_fields[name])
+        return queryset.only(*only)
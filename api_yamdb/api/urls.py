@@ -4,6 +4,7 @@ from rest_framework.routers import DefaultRouter
 from .views import (
     CategoriesViewSet,
     CommentViewSet,
+    ExportView,
     GenresViewSet,
     ReviewViewSet,
     SignUp,
@@ -32,5 +33,6 @@ router.register(
 urlpatterns = [
     path('v1/auth/signup/', SignUp.as_view()),
     path('v1/auth/token/', TokenView.as_view()),
+    path('v1/export/<str:table>/', ExportView.as_view()),
     path('v1/', include(router.urls)),
 ]
@@ -1,32 +1,97 @@
-from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
-from django.core.mail import send_mail
-from django.db.models import Avg
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters, mixins, status, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
 from rest_framework.pagination import LimitOffsetPagination
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
-from reviews.models import Category, Genre, Review, Title, User
+from reviews.csvdata import (
+    TABLES,
+    USERS,
+    csv_lines,
+    export_rows,
+    join_chunks,
+    ndjson_lines,
+)
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleRank,
+    User,
+)
+from users.models import OutgoingEmail
+from .bulk import BulkUpsertMixin, upsert_titles
+from .cache import CachedListMixin, CachedResponseMixin
 from .filters import TitleFilter
-from .permissions import IsAdmin, IsModerator, IsSuperuser, IsUser, ReadOnly
+from .pagination import (
+    PubDatePagination,
+    RatingRankPagination,
+    ReviewsRankPagination,
+    YearPagination,
+)
+from .permissions import (
+    IsAdmin,
+    IsAuthorOrStaffOrReadOnly,
+    IsSuperuser,
+    IsUser,
+    ReadOnly,
+)
 from .serializers import (
+    CategoryBulkSerializer,
     CategorySerializer,
     CommentSerializer,
+    GenreBulkSerializer,
     GenreSerializer,
     MeSerializer,
     ReviewSerializer,
     SignUpSerializer,
+    TitleBulkSerializer,
     TitleSerializer,
     TokenSerializer,
     UserSerializer
 )
+from .sparse import SparseFieldsMixin
+
+DUPLICATE_USER_MESSAGE = (
+    'А Вы точно зедсь первый раз?!'
+    'Я точно помню, что такие username и/или email уже видел :)'
+)
+
+BATCH_MAX_SIZE = 100
+
+# Раскладка колонок та же, что читает importdb; пользователи
+# не выгружаются.
+EXPORT_TABLES = {table.name: table for table in TABLES if table is not USERS}
+
+EXPORT_FORMATS = {
+    'csv': (csv_lines, 'text/csv; charset=utf-8'),
+    'ndjson': (ndjson_lines, 'application/x-ndjson'),
+}
+
+DUPLICATE_REVIEW_MESSAGE = (
+    'Нельзя оставить повторный отзыв на одно произведение'
+)
+
 
+def save_user(serializer):
+    try:
+        with transaction.atomic():
+            return serializer.save()
+    except IntegrityError:
+        raise ValidationError(DUPLICATE_USER_MESSAGE)
 
-class UserView(viewsets.ModelViewSet):
+
+class UserView(CachedResponseMixin, viewsets.ModelViewSet):
+    invalidates = ('users',)
     serializer_class = UserSerializer
     queryset = User.objects.all()
     filter_backends = (filters.SearchFilter,)
@@ -35,6 +100,29 @@ class UserView(viewsets.ModelViewSet):
     http_method_names = ['get', 'post', 'patch', 'delete']
     permission_classes = (IsAdmin | IsSuperuser,)
 
+    def perform_create(self, serializer):
+        save_user(serializer)
+
+    def perform_update(self, serializer):
+        save_user(serializer)
+
+    def perform_destroy(self, instance):
+        # Вместе с пользователем удаляются его отзывы, у произведений
+        # меняется рейтинг.
+        self.changed_titles = set(
+            instance.reviews.values_list('title_id', flat=True)
+        )
+        super().perform_destroy(instance)
+
+    def get_invalidated_resources(self):
+        resources = super().get_invalidated_resources()
+        changed_titles = getattr(self, 'changed_titles', ())
+        if not changed_titles:
+            return resources
+        return resources + ['titles'] + [
+            f'title:{pk}' for pk in changed_titles
+        ]
+
     @action(url_path='me', methods=['get', 'patch'], detail=False,
             permission_classes=(IsUser,))
     def me(self, request):
@@ -44,14 +132,14 @@ class UserView(viewsets.ModelViewSet):
             return Response(serializer.data)
 
         if request.method == 'PATCH':
-            user = User.objects.get(username=request._user)
+            user = User.objects.get(pk=request.user.pk)
             serializer = serializer_class(
                 user,
                 data=request.data,
                 partial=True
             )
             if serializer.is_valid():
-                serializer.save()
+                save_user(serializer)
                 return Response(
                     serializer.data,
                     status=status.HTTP_200_OK
@@ -65,23 +153,31 @@ class UserView(viewsets.ModelViewSet):
 class SignUp(APIView):
     serializer_class = SignUpSerializer
 
+    @transaction.atomic
     def post(self, request):
         serializer = self.serializer_class(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user, created = User.objects.get_or_create(
-            username=request.data.get('username'),
-            email=request.data.get('email')
+        username = serializer.validated_data['username']
+        email = serializer.validated_data['email']
+        users = list(
+            User.objects.filter(Q(username=username) | Q(email=email))[:2]
         )
+        created = not users
+        if created:
+            try:
+                user = User.objects.create(username=username, email=email)
+            except IntegrityError:
+                raise ValidationError(DUPLICATE_USER_MESSAGE)
+        else:
+            user = users[0]
+            if (
+                len(users) > 1
+                or user.username != username
+                or user.email != email
+            ):
+                raise ValidationError(DUPLICATE_USER_MESSAGE)
 
-        user.save()
-
-        send_mail(
-            'Confirmation code from YaMDB',
-            default_token_generator.make_token(user),
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email],
-            fail_silently=False,
-        )
+        OutgoingEmail.objects.enqueue(user)
 
         if created:
             return Response(
@@ -99,9 +195,10 @@ class TokenView(APIView):
         serializer.is_valid(raise_exception=True)
         username = request.data.get('username')
         confirmation_code = request.data.get('confirmation_code')
-        if not User.objects.filter(username=username).exists():
+        try:
+            user = User.objects.get(username=username)
+        except User.DoesNotExist:
             return Response(status=status.HTTP_404_NOT_FOUND)
-        user = User.objects.get(username=username)
         if default_token_generator.check_token(user, confirmation_code):
             return Response(
                 {
@@ -121,9 +218,16 @@ class PostDeleteListViewSet(
     pass
 
 
-class CategoriesViewSet(PostDeleteListViewSet):
+class CategoriesViewSet(
+    CachedListMixin,
+    BulkUpsertMixin,
+    PostDeleteListViewSet,
+):
+    cache_resources = {'list': ('categories',)}
+    invalidates = ('categories',)
     queryset = Category.objects.all()
     serializer_class = CategorySerializer
+    bulk_serializer_class = CategoryBulkSerializer
     permission_classes = (IsAdmin | ReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
@@ -131,9 +235,16 @@ class CategoriesViewSet(PostDeleteListViewSet):
     lookup_field = 'slug'
 
 
-class GenresViewSet(PostDeleteListViewSet):
+class GenresViewSet(
+    CachedListMixin,
+    BulkUpsertMixin,
+    PostDeleteListViewSet,
+):
+    cache_resources = {'list': ('genres',)}
+    invalidates = ('genres',)
     queryset = Genre.objects.all()
     serializer_class = GenreSerializer
+    bulk_serializer_class = GenreBulkSerializer
     permission_classes = (IsAdmin | ReadOnly,)
     filter_backends = (filters.SearchFilter,)
     search_fields = ('name',)
@@ -141,56 +252,282 @@ class GenresViewSet(PostDeleteListViewSet):
     lookup_field = 'slug'
 
 
-class TitleViewSet(viewsets.ModelViewSet):
-    queryset = Title.objects.all().annotate(
-        Avg('reviews__score')
-    )
+class TitleViewSet(
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    BulkUpsertMixin,
+    viewsets.ModelViewSet,
+):
+    cache_resources = {
+        'list': ('titles', 'categories', 'genres'),
+        'retrieve': ('title:{pk}', 'categories', 'genres'),
+        'batch': ('titles', 'categories', 'genres'),
+        'top': ('titles', 'categories', 'genres'),
+        'weekly': ('titles', 'categories', 'genres'),
+    }
+    invalidates = ('titles', 'title:{pk}', 'reviews:{pk}')
+    batch_max_size = BATCH_MAX_SIZE
+    sparse_fields = {
+        'id': ('id',),
+        'genre': (),
+        'category': ('category', 'category__name', 'category__slug'),
+        'description': ('description',),
+        'rating': ('rating_sum', 'rating_count'),
+        'reviews_count': ('rating_count',),
+        'name': ('name',),
+        'year': ('year',),
+    }
+    sparse_select = {'category': 'category'}
+    sparse_prefetch = {'genre': 'genre'}
     serializer_class = TitleSerializer
+    bulk_serializer_class = TitleBulkSerializer
     permission_classes = (IsAdmin | ReadOnly,)
     filter_backends = (DjangoFilterBackend,)
     filterset_class = TitleFilter
-    pagination_class = LimitOffsetPagination
+    pagination_class = YearPagination
+
+    def get_queryset(self):
+        return self.get_sparse_queryset(
+            Title.objects.defer('search_vector')
+        )
 
+    @action(detail=False, methods=['get'])
+    def batch(self, request):
+        return self.cached(self.get_batch, request)
 
-class ReviewViewSet(viewsets.ModelViewSet):
-    serializer_class = ReviewSerializer
-    permission_classes = (
-        ReadOnly
-        | IsSuperuser
-        | IsAdmin
-        | IsModerator
-        | IsUser,
+    def get_batch(self, request):
+        ids = self.get_batch_ids(request)
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids if pk in titles],
+            many=True,
+        )
+        return Response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def top(self, request):
+        return self.cached(self.get_leaderboard, request)
+
+    @action(detail=False, methods=['get'])
+    def weekly(self, request):
+        return self.cached(self.get_leaderboard, request)
+
+    def get_leaderboard(self, request):
+        ranks, paginator = self.get_ranks(request)
+        page = paginator.paginate_queryset(
+            ranks.only('title_id', 'rating', 'reviews_count'),
+            request,
+            view=self,
+        )
+        ids = [rank.title_id for rank in page]
+        titles = self.get_queryset().in_bulk(ids)
+        serializer = self.get_serializer(
+            [titles[pk] for pk in ids if pk in titles],
+            many=True,
+        )
+        return paginator.get_paginated_response(serializer.data)
+
+    def get_ranks(self, request):
+        if self.action == 'weekly':
+            return TitleRank.objects.filter(
+                board=TitleRank.WEEK,
+                reviews_count__gt=0,
+            ), ReviewsRankPagination()
+        category = request.query_params.get('category')
+        genre = request.query_params.get('genre')
+        if category and genre:
+            raise ValidationError('Укажите либо категорию, либо жанр')
+        board, group_id = TitleRank.ALL, 0
+        if category:
+            board = TitleRank.CATEGORY
+            group_id = get_object_or_404(Category, slug=category).pk
+        elif genre:
+            board = TitleRank.GENRE
+            group_id = get_object_or_404(Genre, slug=genre).pk
+        return TitleRank.objects.filter(
+            board=board,
+            group_id=group_id,
+            reviews_count__gt=0,
+        ), RatingRankPagination()
+
+    def perform_bulk_upsert(self, items, results):
+        self.changed_titles = upsert_titles(items, results)
+
+    def get_invalidated_resources(self):
+        resources = super().get_invalidated_resources()
+        return resources + [
+            f'title:{pk}' for pk in getattr(self, 'changed_titles', ())
+        ]
+
+    def get_batch_ids(self, request):
+        values = [
+            value.strip()
+            for param in request.query_params.getlist('ids')
+            for value in param.split(',')
+            if value.strip()
+        ]
+        try:
+            ids = list(dict.fromkeys(int(value) for value in values))
+        except ValueError:
+            raise ValidationError({'ids': 'id должны быть целыми числами'})
+        if not ids:
+            raise ValidationError({'ids': 'Укажите id произведений'})
+        if len(ids) > self.batch_max_size:
+            raise ValidationError({
+                'ids': f'Не больше {self.batch_max_size} id за запрос'
+            })
+        return ids
+
+
+class ReviewViewSet(
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
+    cache_resources = {
+        'list': ('reviews:{title_id}', 'title:{title_id}', 'users'),
+        'retrieve': ('reviews:{title_id}', 'title:{title_id}', 'users'),
+    }
+    invalidates = (
+        'reviews:{title_id}',
+        'titles',
+        'title:{title_id}',
+        'comments:{pk}',
     )
+    sparse_fields = {
+        'id': ('id',),
+        'title': ('title', 'title__name'),
+        'author': ('author', 'author__username'),
+        'text': ('text',),
+        'score': ('score',),
+        'pub_date': ('pub_date',),
+        'comments_count': ('comments_count',),
+    }
+    sparse_select = {'author': 'author', 'title': 'title'}
+    pagination_class = PubDatePagination
+    serializer_class = ReviewSerializer
+    permission_classes = (IsAuthorOrStaffOrReadOnly,)
+
+    def get_title(self):
+        if not hasattr(self, '_title'):
+            self._title = get_object_or_404(
+                Title.objects.defer('search_vector'),
+                id=self.kwargs.get('title_id'),
+            )
+        return self._title
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        return title.reviews.all()
+        return self.get_sparse_queryset(Review.objects.filter(
+            title_id=self.kwargs.get('title_id'),
+        ).defer(
+            'title__search_vector',
+        ))
+
+    def get_list_count(self):
+        return self.get_title().rating_count
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_title()
+        return page
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        title = get_object_or_404(Title, id=title_id)
-        serializer.save(author=self.request.user, title=title)
+        title = self.get_title()
+        try:
+            with transaction.atomic():
+                serializer.save(author=self.request.user, title=title)
+        except IntegrityError:
+            # Повтором считается только нарушение уникальности
+            # (title, author), остальные ошибки не маскируются.
+            if not title.reviews.filter(author=self.request.user).exists():
+                raise
+            raise ValidationError(DUPLICATE_REVIEW_MESSAGE)
+
+    @transaction.atomic
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
 
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
 
-class CommentViewSet(viewsets.ModelViewSet):
+
+class CommentViewSet(
+    CachedResponseMixin,
+    SparseFieldsMixin,
+    viewsets.ModelViewSet,
+):
+    cache_resources = {
+        'list': ('comments:{review_id}', 'title:{title_id}', 'users'),
+        'retrieve': ('comments:{review_id}', 'title:{title_id}', 'users'),
+    }
+    # comments_count отзыва есть в ответах списка и страницы отзывов.
+    invalidates = ('comments:{review_id}', 'reviews:{title_id}')
+    sparse_fields = {
+        'id': ('id',),
+        'author': ('author', 'author__username'),
+        'text': ('text',),
+        'pub_date': ('pub_date',),
+    }
+    sparse_select = {'author': 'author'}
+    pagination_class = PubDatePagination
     serializer_class = CommentSerializer
-    permission_classes = (
-        ReadOnly
-        | IsSuperuser
-        | IsAdmin
-        | IsModerator
-        | IsUser,
-    )
+    permission_classes = (IsAuthorOrStaffOrReadOnly,)
+
+    def get_review(self):
+        if not hasattr(self, '_review'):
+            self._review = get_object_or_404(
+                Review,
+                id=self.kwargs.get('review_id'),
+                title_id=self.kwargs.get('title_id'),
+            )
+        return self._review
 
     def get_queryset(self):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        return review.comments.all()
+        return self.get_sparse_queryset(Comment.objects.filter(
+            review_id=self.kwargs.get('review_id'),
+            review__title_id=self.kwargs.get('title_id'),
+        ))
+
+    def get_list_count(self):
+        return self.get_review().comments_count
 
+    def paginate_queryset(self, queryset):
+        page = super().paginate_queryset(queryset)
+        if not page:
+            self.get_review()
+        return page
+
+    @transaction.atomic
     def perform_create(self, serializer):
-        title_id = self.kwargs.get('title_id')
-        review_id = self.kwargs.get('review_id')
-        review = get_object_or_404(Review, id=review_id, title=title_id)
-        serializer.save(author=self.request.user, review=review)
+        serializer.save(author=self.request.user, review=self.get_review())
+
+    @transaction.atomic
+    def perform_destroy(self, instance):
+        super().perform_destroy(instance)
+
+
+class ExportView(APIView):
+    permission_classes = (IsAdmin,)
+
+    def get(self, request, table):
+        if table not in EXPORT_TABLES:
+            raise NotFound(f'Таблица {table} не выгружается')
+        # Не format: этот параметр DRF использует для выбора рендерера.
+        fmt = request.query_params.get('fmt', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({
+                'fmt': f'Допустимые форматы: {", ".join(EXPORT_FORMATS)}'
+            })
+        table = EXPORT_TABLES[table]
+        lines, content_type = EXPORT_FORMATS[fmt]
+        response = StreamingHttpResponse(
+            join_chunks(lines(table, export_rows(table))),
+            content_type=content_type,
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{table.name}.{fmt}"'
+        )
+        return response
@@ -0,0 +1,315 @@
+"""Метрики приложения в текстовом формате Prometheus.
+
+Каждый процесс копит значения в памяти. Если задан METRICS['DIR'],
+процесс периодически сохраняет снимок своих значений в файл
+<DIR>/<pid>.json, а /metrics складывает снимки всех процессов, так что
+под gunicorn с несколькими воркерами ответ не зависит от того, какой
+воркер его отдал. Каталог очищается при деплое: файлы остановленных
+воркеров продолжают учитываться, чтобы счётчики не уменьшались.
+"""
+import json
+import os
+import threading
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import Http404, HttpResponse
+
+from api.middleware import QueryTimer
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+def escape_label(value):
+    return value.replace('\\', r'\\').replace('"', r'\"').replace(
+        '\n', r'\n'
+    )
+
+
+def format_labels(labelnames, values, extra=()):
+    pairs = list(zip(labelnames, values)) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(
+        f'{name}="{escape_label(value)}"' for name, value in pairs
+    ) + '}'
+
+
+def format_value(value):
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value))
+
+
+class Metric:
+    type = None
+
+    def __init__(self, registry, name, documentation, labelnames=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.values = {}
+
+    def label_values(self, labels):
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def header(self):
+        return [
+            f'# HELP {self.name} {self.documentation}',
+            f'# TYPE {self.name} {self.type}',
+        ]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self.label_values(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def merge(self, values, other):
+        for key, value in other:
+            key = tuple(key)
+            values[key] = values.get(key, 0) + value
+
+    def samples(self, values):
+        return [
+            (self.name, format_labels(self.labelnames, key), value)
+            for key, value in sorted(values.items())
+        ]
+
+
+class Histogram(Metric):
+    type = 'histogram'
+
+    def __init__(self, *args, buckets=BUCKETS, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.buckets = tuple(buckets) + (float('inf'),)
+
+    def observe(self, value, **labels):
+        key = self.label_values(labels)
+        with self.registry.lock:
+            # Счётчики по корзинам, затем сумма и количество.
+            state = self.values.get(key)
+            if state is None:
+                state = self.values[key] = [0] * (len(self.buckets) + 2)
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+                    break
+            state[-2] += value
+            state[-1] += 1
+
+    def merge(self, values, other):
+        for key, state in other:
+            key = tuple(key)
+            current = values.setdefault(key, [0] * len(state))
+            for index, value in enumerate(state):
+                current[index] += value
+
+    def samples(self, values):
+        samples = []
+        for key, state in sorted(values.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, state):
+                cumulative += count
+                samples.append((
+                    f'{self.name}_bucket',
+                    format_labels(
+                        self.labelnames, key, [('le', format_value(bound))]
+                    ),
+                    cumulative,
+                ))
+            labels = format_labels(self.labelnames, key)
+            samples.append((f'{self.name}_sum', labels, state[-2]))
+            samples.append((f'{self.name}_count', labels, state[-1]))
+        return samples
+
+
+class Gauge(Metric):
+    """Значение вычисляется функцией при каждом запросе /metrics и между
+    процессами не складывается."""
+
+    type = 'gauge'
+
+    def __init__(self, *args, function, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.function = function
+
+    def samples(self, values):
+        return [(self.name, '', self.function())]
+
+
+class Registry:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self.flushed_at = 0.0
+
+    def register(self, metric):
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labelnames=()):
+        return self.register(Counter(self, name, documentation, labelnames))
+
+    def histogram(self, name, documentation, labelnames=(), **kwargs):
+        return self.register(
+            Histogram(self, name, documentation, labelnames, **kwargs)
+        )
+
+    def gauge(self, name, documentation, function):
+        return self.register(
+            Gauge(self, name, documentation, function=function)
+        )
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                name: [
+                    [key, list(value) if isinstance(value, list) else value]
+                    for key, value in metric.values.items()
+                ]
+                for name, metric in self.metrics.items()
+                if not isinstance(metric, Gauge)
+            }
+
+    def flush(self, directory):
+        path = os.path.join(directory, f'{os.getpid()}.json')
+        temporary = f'{path}.tmp'
+        with open(temporary, 'w') as file:
+            json.dump(self.snapshot(), file)
+        os.replace(temporary, path)
+        self.flushed_at = time.monotonic()
+
+    def flush_if_due(self, directory, interval):
+        if time.monotonic() - self.flushed_at >= interval:
+            self.flush(directory)
+
+    def snapshots(self, directory):
+        """Снимки всех процессов, свой сохраняется перед чтением."""
+        if directory is None:
+            return [self.snapshot()]
+        self.flush(directory)
+        snapshots = []
+        for filename in os.listdir(directory):
+            if not filename.endswith('.json'):
+                continue
+            try:
+                with open(os.path.join(directory, filename)) as file:
+                    snapshots.append(json.load(file))
+            except (OSError, ValueError):
+                # Файл удалён или дописывается без os.replace.
+                continue
+        return snapshots
+
+    def collect(self, directory=None):
+        values = {name: {} for name in self.metrics}
+        for snapshot in self.snapshots(directory):
+            for name, other in snapshot.items():
+                metric = self.metrics.get(name)
+                if metric is not None:
+                    metric.merge(values[name], other)
+        lines = []
+        for name, metric in self.metrics.items():
+            lines.extend(metric.header())
+            lines.extend(
+                f'{sample}{labels} {format_value(value)}'
+                for sample, labels, value in metric.samples(values[name])
+            )
+        return '\n'.join(lines) + '\n'
+
+
+def pending_emails():
+    from users.models import OutgoingEmail
+
+    return OutgoingEmail.objects.filter(sent_at__isnull=True).count()
+
+
+registry = Registry()
+
+REQUESTS = registry.counter(
+    'http_requests_total',
+    'Количество HTTP-запросов',
+    ('view', 'method', 'status'),
+)
+REQUEST_DURATION = registry.histogram(
+    'http_request_duration_seconds',
+    'Время обработки HTTP-запроса',
+    ('view', 'method'),
+)
+DB_QUERIES = registry.counter(
+    'db_queries_total',
+    'Количество SQL-запросов',
+    ('view',),
+)
+DB_DURATION = registry.counter(
+    'db_query_duration_seconds_total',
+    'Суммарное время SQL-запросов',
+    ('view',),
+)
+AUTH_CACHE = registry.counter(
+    'auth_user_cache_requests_total',
+    'Обращения к кэшу пользователей при аутентификации',
+    ('result',),
+)
+EMAIL_QUEUE = registry.gauge(
+    'email_queue_depth',
+    'Неотправленные письма в очереди',
+    pending_emails,
+)
+
+
+def view_label(request):
+    match = getattr(request, 'resolver_match', None)
+    # Неизвестные адреса не плодят отдельные серии.
+    return match.view_name if match else 'unmatched'
+
+
+class MetricsMiddleware:
+
+    def __init__(self, get_response):
+        if not settings.METRICS['ENABLED']:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.directory = settings.METRICS['DIR']
+        self.flush_interval = settings.METRICS['FLUSH_INTERVAL']
+        if self.directory is not None:
+            os.makedirs(self.directory, exist_ok=True)
+
+    def __call__(self, request):
+        queries = QueryTimer()
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(queries))
+            response = self.get_response(request)
+        view = view_label(request)
+        REQUEST_DURATION.observe(
+            time.perf_counter() - start, view=view, method=request.method
+        )
+        REQUESTS.inc(
+            view=view, method=request.method, status=response.status_code
+        )
+        DB_QUERIES.inc(queries.count, view=view)
+        DB_DURATION.inc(queries.duration, view=view)
+        if self.directory is not None:
+            registry.flush_if_due(self.directory, self.flush_interval)
+        return response
+
+
+def metrics_view(request):
+    if not settings.METRICS['ENABLED']:
+        raise Http404
+    return HttpResponse(
+        registry.collect(settings.METRICS['DIR']),
+        content_type=CONTENT_TYPE,
+    )
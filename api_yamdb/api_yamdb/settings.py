@@ -28,6 +28,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'jwt',
     'django_filters',
@@ -37,6 +38,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'api_yamdb.metrics.MetricsMiddleware',
+    'api.middleware.ProfilingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -82,6 +85,80 @@ DATABASES = {
 }
 
 
+# Cache. The default LocMemCache is per process: with several workers or
+# with rebuildleaderboards in its own container, response cache versions
+# are only shared through a common backend such as memcached
+# (infra/docker-compose.yaml).
+
+CACHES = {
+    'default': {
+        'BACKEND': os.getenv('CACHE_BACKEND', default='django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.getenv('CACHE_LOCATION', default=''),
+    }
+}
+
+# Local entries are per process: on other workers a change becomes visible
+# after TTL seconds at most. SHARED_CACHE names an alias in CACHES.
+
+AUTH_USER_CACHE = {
+    'MAX_SIZE': int(os.getenv('AUTH_USER_CACHE_SIZE', default=10000)),
+    'TTL': int(os.getenv('AUTH_USER_CACHE_TTL', default=60)),
+    'SHARED_CACHE': os.getenv('AUTH_USER_CACHE_SHARED') or None,
+    'SHARED_TTL': int(os.getenv('AUTH_USER_CACHE_SHARED_TTL', default=300)),
+}
+
+# Anonymous API responses are cached for this many seconds. ETags and
+# cache keys are built from resource versions, which API writes, model
+# signals (admin, shell) and the import and rebuild commands bump at once.
+# QuerySet.update() and bulk_create() elsewhere send no signals: call
+# api.cache.invalidate_all() after them, otherwise the change reaches
+# conditional GETs only when the versions expire after
+# API_CACHE_VERSION_TIMEOUT seconds.
+
+API_CACHE_TIMEOUT = int(os.getenv('API_CACHE_TIMEOUT', default=60))
+API_CACHE_VERSION_TIMEOUT = int(
+    os.getenv('API_CACHE_VERSION_TIMEOUT', default=3600)
+)
+
+# Per-request SQL and timing instrumentation, off by default. When off the
+# middleware removes itself at startup. Requests issuing more queries than
+# QUERY_BUDGET (or BUDGETS[view_name]) are logged as warnings.
+
+API_PROFILING = {
+    'ENABLED': os.getenv('API_PROFILING', default='') == '1',
+    'HEADER': os.getenv('API_PROFILING_HEADER', default='1') == '1',
+    'QUERY_BUDGET': int(os.getenv('API_PROFILING_QUERY_BUDGET', default=10)),
+    'BUDGETS': {},
+}
+
+# Prometheus metrics at /metrics. With several gunicorn workers set DIR to
+# a directory shared by them and emptied on deploy: each worker writes its
+# values there at most every FLUSH_INTERVAL seconds.
+
+METRICS = {
+    'ENABLED': os.getenv('METRICS', default='') == '1',
+    'DIR': os.getenv('METRICS_DIR') or None,
+    'FLUSH_INTERVAL': float(os.getenv('METRICS_FLUSH_INTERVAL', default=5)),
+}
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api.profiling': {
+            'handlers': ['console'],
+            'level': 'INFO',
+            'propagate': False,
+        },
+    },
+}
+
+
 # Password validation
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -132,10 +209,14 @@ REST_FRAMEWORK = {
     ],
 
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework.authentication.TokenAuthentication',
         'api.backends.JWTAuthentication',
     ),
 
+    'DEFAULT_RENDERER_CLASSES': (
+        'api.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ),
+
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
     'PAGE_SIZE': 10,
 
@@ -0,0 +1,119 @@
+import csv
+import datetime
+import json
+import os
+from collections import namedtuple
+
+from django.conf import settings
+
+from .models import Category, Comment, Genre, Review, Title, TitleGenre, User
+
+DATA_DIR = os.path.join(settings.BASE_DIR, 'static/data/')
+
+EXPORT_CHUNK_SIZE = 2000
+
+Table = namedtuple('Table', ('name', 'file', 'model', 'columns'))
+
+# Колонки CSV в порядке файла: (колонка CSV, attname поля модели).
+USERS = Table('users', 'users.csv', User, (
+    ('id', 'id'),
+    ('username', 'username'),
+    ('email', 'email'),
+    ('role', 'role'),
+    ('bio', 'bio'),
+    ('first_name', 'first_name'),
+    ('last_name', 'last_name'),
+))
+CATEGORY = Table('category', 'category.csv', Category, (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('slug', 'slug'),
+))
+GENRE = Table('genre', 'genre.csv', Genre, (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('slug', 'slug'),
+))
+TITLE = Table('titles', 'titles.csv', Title, (
+    ('id', 'id'),
+    ('name', 'name'),
+    ('year', 'year'),
+    ('category', 'category_id'),
+))
+GENRE_TITLE = Table('genre_title', 'genre_title.csv', TitleGenre, (
+    ('id', 'id'),
+    ('title_id', 'title_id'),
+    ('genre_id', 'genre_id'),
+))
+REVIEW = Table('review', 'review.csv', Review, (
+    ('id', 'id'),
+    ('title_id', 'title_id'),
+    ('text', 'text'),
+    ('author', 'author_id'),
+    ('score', 'score'),
+    ('pub_date', 'pub_date'),
+))
+COMMENTS = Table('comments', 'comments.csv', Comment, (
+    ('id', 'id'),
+    ('review_id', 'review_id'),
+    ('text', 'text'),
+    ('author', 'author_id'),
+    ('pub_date', 'pub_date'),
+))
+
+# Таблицы в порядке зависимостей по внешним ключам.
+TABLES = (USERS, CATEGORY, GENRE, TITLE, GENRE_TITLE, REVIEW, COMMENTS)
+
+
+def foreign_keys(table):
+    keys = {}
+    for column, attname in table.columns:
+        field = table.model._meta.get_field(attname)
+        if field.is_relation:
+            keys[column] = field
+    return keys
+
+
+def export_rows(table, chunk_size=EXPORT_CHUNK_SIZE):
+    attnames = [attname for column, attname in table.columns]
+    return table.model.objects.order_by('pk').values_list(
+        *attnames
+    ).iterator(chunk_size=chunk_size)
+
+
+def export_value(value):
+    if isinstance(value, datetime.datetime):
+        return value.isoformat().replace('+00:00', 'Z')
+    return value
+
+
+class Echo:
+    """Псевдофайл для csv.writer: writerow возвращает записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+def csv_lines(table, rows):
+    writer = csv.writer(Echo())
+    yield writer.writerow([column for column, attname in table.columns])
+    for row in rows:
+        yield writer.writerow([export_value(value) for value in row])
+
+
+def ndjson_lines(table, rows):
+    columns = [column for column, attname in table.columns]
+    for row in rows:
+        record = dict(zip(columns, (export_value(value) for value in row)))
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def join_chunks(lines, size=EXPORT_CHUNK_SIZE):
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk)
+            chunk = []
+    if chunk:
+        yield ''.join(chunk)
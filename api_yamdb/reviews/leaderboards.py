@@ -0,0 +1,115 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, FloatField, Subquery
+from django.db.models.functions import Cast, Coalesce, NullIf
+from django.utils import timezone
+
+from .models import Review, Title, TitleRank
+
+BATCH_SIZE = 5000
+
+WEEK = timedelta(days=7)
+
+RATED_BOARDS = (TitleRank.ALL, TitleRank.CATEGORY, TitleRank.GENRE)
+
+
+def rated_rows(titles):
+    # По строке на пару произведение-жанр, LEFT JOIN через TitleGenre.
+    return titles.filter(rating_count__gt=0).order_by().values_list(
+        'id', 'category_id', 'rating_sum', 'rating_count', 'genre',
+    )
+
+
+def rating_ranks(rows):
+    ranks = {}
+    for title_id, category_id, rating_sum, rating_count, genre_id in rows:
+        boards = [(TitleRank.ALL, 0)]
+        if category_id is not None:
+            boards.append((TitleRank.CATEGORY, category_id))
+        if genre_id is not None:
+            boards.append((TitleRank.GENRE, genre_id))
+        for board, group_id in boards:
+            ranks[board, group_id, title_id] = TitleRank(
+                board=board,
+                group_id=group_id,
+                title_id=title_id,
+                rating=rating_sum / rating_count,
+                reviews_count=rating_count,
+            )
+    return list(ranks.values())
+
+
+def refresh_titles(title_ids):
+    """Пересобирает строки рейтинговых таблиц для произведений."""
+    title_ids = list(title_ids)
+    ranks = rating_ranks(rated_rows(Title.objects.filter(pk__in=title_ids)))
+    TitleRank.objects.filter(
+        title_id__in=title_ids,
+        board__in=RATED_BOARDS,
+    ).delete()
+    # Параллельный пересчёт того же произведения мог вставить строки.
+    TitleRank.objects.bulk_create(ranks, ignore_conflicts=True)
+
+
+def update_title(title_id):
+    """Обновляет оценку в существующих строках одним запросом, новых
+    строк не создаёт; возвращает количество обновлённых строк.
+
+    Отзывы удаляются и каскадом вместе с произведением, вставка строк
+    в этот момент нарушила бы внешний ключ. Строки без отзывов
+    остаются с reviews_count=0 до пересборки и не показываются.
+    """
+    title = Title.objects.filter(pk=title_id)
+    return TitleRank.objects.filter(
+        title_id=title_id,
+        board__in=RATED_BOARDS,
+    ).update(
+        rating=Subquery(title.values(value=Coalesce(
+            Cast('rating_sum', FloatField()) / NullIf('rating_count', 0),
+            0.0,
+        ))),
+        reviews_count=Subquery(title.values('rating_count')),
+    )
+
+
+def count_weekly_review(title_id, delta):
+    ranks = TitleRank.objects.filter(
+        board=TitleRank.WEEK,
+        group_id=0,
+        title_id=title_id,
+    )
+    if delta < 0:
+        ranks = ranks.filter(reviews_count__gte=-delta)
+    updated = ranks.update(reviews_count=F('reviews_count') + delta)
+    if not updated and delta > 0:
+        TitleRank.objects.bulk_create(
+            [TitleRank(board=TitleRank.WEEK, title_id=title_id,
+                       reviews_count=delta)],
+            ignore_conflicts=True,
+        )
+
+
+def is_this_week(review):
+    return review.pub_date is not None and (
+        timezone.now() - review.pub_date < WEEK
+    )
+
+
+def rebuild(batch_size=BATCH_SIZE):
+    """Полностью пересобирает таблицы; отзывы старше недели выпадают
+    из недельной таблицы только здесь."""
+    since = timezone.now() - WEEK
+    with transaction.atomic():
+        TitleRank.objects.all().delete()
+        ranks = rating_ranks(rated_rows(Title.objects.all()).iterator())
+        weekly = Review.objects.filter(
+            pub_date__gte=since,
+        ).order_by().values_list('title').annotate(count=Count('pk'))
+        ranks.extend(
+            TitleRank(board=TitleRank.WEEK, title_id=title_id,
+                      reviews_count=count)
+            for title_id, count in weekly.iterator()
+        )
+        TitleRank.objects.bulk_create(ranks, batch_size=batch_size)
+    return len(ranks)
@@ -0,0 +1,232 @@
+import random
+from datetime import timedelta
+from itertools import islice
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import Max, Q
+from django.utils import timezone
+
+from reviews.csvdata import TABLES
+from reviews.management.commands.importdb import (
+    BATCH_SIZE,
+    finish_import,
+    keep_auto_dates,
+)
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleGenre,
+    User,
+)
+from users.models import ADMIN
+
+USERNAME_PREFIX = 'bench'
+ADMIN_USERNAME = f'{USERNAME_PREFIX}-admin'
+
+DAYS = 30
+
+WORDS = (
+    'тихий', 'дом', 'река', 'ночь', 'огонь', 'путь', 'город', 'море',
+    'зима', 'сад', 'ветер', 'песня', 'утро', 'лес', 'гора', 'звезда',
+)
+
+
+def bulk_insert(model, objects, batch_size):
+    objects = iter(objects)
+    while True:
+        batch = list(islice(objects, batch_size))
+        if not batch:
+            return
+        model.objects.bulk_create(batch)
+
+
+class Generator:
+    """Детерминированный набор данных: при одном seed и размерах
+    совпадают тексты, оценки и первичные ключи (с 1), так что адреса
+    из журнала запросов нагрузочного теста указывают на те же объекты.
+    """
+
+    def __init__(self, titles=1000, genres=20, categories=10, users=200,
+                 reviews=10, comments=2, days=DAYS, seed=0,
+                 batch_size=BATCH_SIZE):
+        self.titles = titles
+        self.genres = genres
+        self.categories = categories
+        self.users = users
+        # У автора не больше одного отзыва на произведение.
+        self.reviews = min(reviews, users)
+        self.comments = comments
+        self.dates_span = timedelta(days=days)
+        self.random = random.Random(seed)
+        self.batch_size = batch_size
+        self.now = timezone.now()
+
+    def text(self, words):
+        return ' '.join(self.random.choice(WORDS) for _ in range(words))
+
+    def insert(self, model, objects):
+        bulk_insert(model, objects, self.batch_size)
+
+    def run(self):
+        first_user = (User.objects.aggregate(last=Max('id'))['last'] or 0) + 1
+        self.insert(User, self.generate_users(first_user))
+        self.insert(Category, (
+            Category(id=i, name=f'Категория {i}', slug=f'category-{i}')
+            for i in range(1, self.categories + 1)
+        ))
+        self.insert(Genre, (
+            Genre(id=i, name=f'Жанр {i}', slug=f'genre-{i}')
+            for i in range(1, self.genres + 1)
+        ))
+        self.insert(Title, self.generate_titles())
+        self.insert(TitleGenre, self.generate_title_genres())
+        with keep_auto_dates(Review, {'pub_date'}):
+            self.insert(Review, self.generate_reviews(first_user))
+        with keep_auto_dates(Comment, {'pub_date'}):
+            self.insert(Comment, self.generate_comments(first_user))
+
+    def generate_users(self, first_id):
+        yield User(
+            id=first_id,
+            username=ADMIN_USERNAME,
+            email=f'{ADMIN_USERNAME}@yamdb.fake',
+            role=ADMIN,
+        )
+        for i in range(1, self.users + 1):
+            yield User(
+                id=first_id + i,
+                username=f'{USERNAME_PREFIX}{i}',
+                email=f'{USERNAME_PREFIX}{i}@yamdb.fake',
+            )
+
+    def generate_titles(self):
+        for i in range(1, self.titles + 1):
+            yield Title(
+                id=i,
+                name=self.text(3).capitalize(),
+                year=self.random.randint(1950, self.now.year),
+                description=self.text(20),
+                category_id=self.random.randint(1, self.categories),
+            )
+
+    def generate_title_genres(self):
+        link_id = 0
+        for title_id in range(1, self.titles + 1):
+            count = self.random.randint(1, min(3, self.genres))
+            for genre_id in self.random.sample(
+                range(1, self.genres + 1), count
+            ):
+                link_id += 1
+                yield TitleGenre(
+                    id=link_id, title_id=title_id, genre_id=genre_id
+                )
+
+    def pub_date(self):
+        return self.now - self.random.random() * self.dates_span
+
+    def generate_reviews(self, first_user):
+        for title_index in range(self.titles):
+            authors = self.random.sample(
+                range(first_user + 1, first_user + self.users + 1),
+                self.reviews,
+            )
+            for index, author_id in enumerate(authors):
+                yield Review(
+                    id=title_index * self.reviews + index + 1,
+                    title_id=title_index + 1,
+                    author_id=author_id,
+                    text=self.text(30),
+                    score=self.random.randint(1, 10),
+                    pub_date=self.pub_date(),
+                )
+
+    def generate_comments(self, first_user):
+        for review_index in range(self.titles * self.reviews):
+            for index in range(self.comments):
+                yield Comment(
+                    id=review_index * self.comments + index + 1,
+                    review_id=review_index + 1,
+                    author_id=self.random.randint(
+                        first_user + 1, first_user + self.users
+                    ),
+                    text=self.text(10),
+                    pub_date=self.pub_date(),
+                )
+
+
+def clear():
+    Title.objects.all().delete()
+    TitleGenre.objects.all().delete()
+    Category.objects.all().delete()
+    Genre.objects.all().delete()
+    # Только имена, которые выдаёт генератор: bench-admin и bench<N>.
+    User.objects.filter(
+        Q(username=ADMIN_USERNAME)
+        | Q(username__regex=rf'^{USERNAME_PREFIX}[0-9]+$')
+    ).delete()
+
+
+def generate(clear_data=False, **options):
+    with transaction.atomic():
+        if clear_data:
+            clear()
+        elif Title.objects.exists() or Category.objects.exists():
+            raise CommandError(
+                'В базе уже есть произведения, используйте --clear'
+            )
+        Generator(**options).run()
+        finish_import(TABLES)
+    # Ответы на анонимные запросы, закэшированные до генерации.
+    cache.clear()
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу тестовыми данными для нагрузочного тестирования; '
+        'с --clear удаляет произведения, категории, жанры, пользователей '
+        f'{USERNAME_PREFIX}<N> и {ADMIN_USERNAME} и очищает кэш'
+    )
+
+    def add_arguments(self, parser):
+        for name, default, text in (
+            ('titles', 1000, 'Количество произведений'),
+            ('genres', 20, 'Количество жанров'),
+            ('categories', 10, 'Количество категорий'),
+            ('users', 200, 'Количество пользователей'),
+            ('reviews', 10, 'Отзывов на произведение'),
+            ('comments', 2, 'Комментариев к отзыву'),
+            ('days', DAYS, 'За сколько последних дней датируются отзывы'),
+            ('seed', 0, 'Начальное значение генератора случайных чисел'),
+            ('batch-size', BATCH_SIZE, 'Строк в одной пачке вставки'),
+        ):
+            parser.add_argument(f'--{name}', type=int, default=default,
+                                help=text)
+        parser.add_argument(
+            '--clear',
+            action='store_true',
+            help='Удалить существующие данные перед генерацией',
+        )
+
+    def handle(self, *args, **options):
+        generate(
+            clear_data=options['clear'],
+            titles=options['titles'],
+            genres=options['genres'],
+            categories=options['categories'],
+            users=options['users'],
+            reviews=options['reviews'],
+            comments=options['comments'],
+            days=options['days'],
+            seed=options['seed'],
+            batch_size=options['batch_size'],
+        )
+        print(
+            f'Созданы {options["titles"]} произведений, '
+            f'пользователи {USERNAME_PREFIX}1..{options["users"]} '
+            f'и {ADMIN_USERNAME}'
+        )
@@ -1,138 +1,190 @@
 import csv
 import os
-
-from django.conf import settings
-from django.core.management.base import BaseCommand
-from django.shortcuts import get_object_or_404
-
-from reviews.models import (
-    User,
-    Category,
-    Genre,
-    Title,
-    Comment,
-    Review,
-    TitleGenre,
+import time
+from contextlib import contextmanager
+from itertools import islice
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, transaction
+
+from api.cache import invalidate_all
+from reviews import leaderboards
+from reviews.csvdata import (
+    COMMENTS,
+    DATA_DIR,
+    REVIEW,
+    TABLES,
+    foreign_keys,
 )
+from reviews.models import Review, Title
+from reviews.pgcopy import copy_tables
 
-USERS = 'users.csv'
-CATEGORY = 'category.csv'
-GENRE = 'genre.csv'
-TITLE = 'titles.csv'
-GENRE_TITLE = 'genre_title.csv'
-COMMENTS = 'comments.csv'
-REVIEW = 'review.csv'
+BATCH_SIZE = 5000
 
 
-def get_reader(file):
-    csv_path = os.path.join(settings.BASE_DIR, 'static/data/', file)
-    csv_file = open(csv_path, encoding='utf-8')
+def read_batches(csv_file, batch_size):
     reader = csv.DictReader(csv_file, delimiter=',')
-    return reader
-
-
-def import_users():
-    csv_reader = get_reader(USERS)
-    for row in csv_reader:
-        obj, created = User.objects.get_or_create(
-            id=row['id'],
-            username=row['username'],
-            email=row['email'],
-            role=row['role'],
-            bio=row['bio'],
-            first_name=row['first_name'],
-            last_name=row['last_name'],
+    while True:
+        batch = list(islice(reader, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+@contextmanager
+def keep_auto_dates(model, attnames):
+    fields = [
+        field for field in model._meta.concrete_fields
+        if getattr(field, 'auto_now_add', False) and field.attname in attnames
+    ]
+    for field in fields:
+        field.auto_now_add = False
+    try:
+        yield
+    finally:
+        for field in fields:
+            field.auto_now_add = True
+
+
+class Importer:
+    def __init__(self, data_dir, batch_size):
+        self.data_dir = data_dir
+        self.batch_size = batch_size
+        self.known_ids = {}
+
+    def get_known_ids(self, model):
+        if model not in self.known_ids:
+            self.known_ids[model] = set(
+                model.objects.values_list('id', flat=True).iterator()
+            )
+        return self.known_ids[model]
+
+    def make_objects(self, table, rows, keys):
+        objects = []
+        for row in rows:
+            values = {}
+            for column, attname in table.columns:
+                value = row[column]
+                if column in keys:
+                    ids, null = keys[column]
+                    value = int(value) if value else None
+                    if value not in ids and not (value is None and null):
+                        break
+                values[attname] = value
+            else:
+                objects.append(table.model(**values))
+        return objects
+
+    def import_table(self, table):
+        keys = {
+            column: (self.get_known_ids(field.related_model), field.null)
+            for column, field in foreign_keys(table).items()
+        }
+        processed = skipped = 0
+        # bulk_create(ignore_conflicts=True) не сообщает, сколько строк
+        # вставлено на самом деле.
+        count_before = table.model.objects.count()
+        started = time.monotonic()
+        path = os.path.join(self.data_dir, table.file)
+        attnames = [attname for column, attname in table.columns]
+        with open(path, encoding='utf-8', newline='') as csv_file, \
+                transaction.atomic(), \
+                keep_auto_dates(table.model, attnames):
+            for rows in read_batches(csv_file, self.batch_size):
+                objects = self.make_objects(table, rows, keys)
+                table.model.objects.bulk_create(
+                    objects,
+                    batch_size=self.batch_size,
+                    ignore_conflicts=True,
+                )
+                processed += len(rows)
+                skipped += len(rows) - len(objects)
+                print(
+                    f'{table.file}: обработано {processed} строк, '
+                    f'{self.rate(processed, started):.0f} строк/с'
+                )
+            inserted = table.model.objects.count() - count_before
+        self.known_ids.pop(table.model, None)
+        print(
+            f'{table.file} успешно импортировалось! '
+            f'Вставлено строк: {inserted}, пропущено: {skipped}, '
+            f'уже были в базе: {processed - skipped - inserted}, '
+            f'{self.rate(processed, started):.0f} строк/с'
         )
-    print(f'{USERS} успешно импортировалось!')
+        return inserted
 
+    def rate(self, rows, started):
+        return rows / max(time.monotonic() - started, 1e-6)
 
-def import_category():
-    csv_reader = get_reader(CATEGORY)
-    for row in csv_reader:
-        obj, created = Category.objects.get_or_create(
-            id=row['id'],
-            name=row['name'],
-            slug=row['slug'],
-        )
-    print(f'{CATEGORY} успешно импортировалось!')
+    def run(self, tables):
+        for table in tables:
+            self.import_table(table)
 
 
-def import_genre():
-    csv_reader = get_reader(GENRE)
-    for row in csv_reader:
-        obj, created = Genre.objects.get_or_create(
-            id=row['id'],
-            name=row['name'],
-            slug=row['slug'],
-        )
-    print(f'{GENRE} успешно импортировалось!')
-
-
-def import_title():
-    csv_reader = get_reader(TITLE)
-    for row in csv_reader:
-        obj_category = get_object_or_404(Category, id=row['category'])
-        obj, created = Title.objects.get_or_create(
-            id=row['id'],
-            name=row['name'],
-            year=row['year'],
-            category=obj_category,
+def finish_import(tables):
+    reset_sequences([table.model for table in tables])
+    if REVIEW in tables:
+        Title.objects.all().update_ratings()
+        print('Рейтинги произведений пересчитаны')
+        leaderboards.rebuild()
+        print('Таблицы лидеров пересобраны')
+    if COMMENTS in tables:
+        Review.objects.all().update_comments_counts()
+        print('Счётчики комментариев пересчитаны')
+    invalidate_all()
+
+
+def reset_sequences(models):
+    statements = connection.ops.sequence_reset_sql(no_style(), models)
+    with connection.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+class Command(BaseCommand):
+    help = 'Импортирует данные из CSV-файлов в static/data/'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--data-dir',
+            default=DATA_DIR,
+            help='Каталог с CSV-файлами',
         )
-    print(f'{TITLE} успешно импортировалось!')
-
-
-def import_genre_title():
-    csv_reader = get_reader(GENRE_TITLE)
-    for row in csv_reader:
-        obj_genre = get_object_or_404(Genre, id=row['genre'])
-        obj_title = get_object_or_404(Title, id=row['title'])
-        obj, created = TitleGenre.objects.get_or_create(
-            id=row['id'],
-            genre=obj_genre,
-            title=obj_title,
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество строк в одной пачке вставки',
         )
-    print(f'{GENRE_TITLE} успешно импортировалось!')
-
-
-def import_comments():
-    csv_reader = get_reader(COMMENTS)
-    for row in csv_reader:
-        obj_review = get_object_or_404(Review, id=row['review_id'])
-        obj_author = get_object_or_404(User, id=row['author'])
-        obj, created = Comment.objects.get_or_create(
-            id=row['id'],
-            review=obj_review,
-            text=row['text'],
-            author=obj_author,
-            pub_date=row['pub_date'],
+        parser.add_argument(
+            '--engine',
+            choices=('orm', 'copy'),
+            default='orm',
+            help='copy загружает файлы через COPY FROM STDIN (PostgreSQL)',
         )
-    print(f'{COMMENTS} успешно импортировалось!')
-
-
-def import_review():
-    csv_reader = get_reader('review.csv')
-    for row in csv_reader:
-        obj_title = get_object_or_404(Title, id=row['title_id'])
-        obj_author = get_object_or_404(User, id=row['author'])
-        obj, created = Review.objects.get_or_create(
-            id=row['id'],
-            title=obj_title,
-            text=row['text'],
-            author=obj_author,
-            score=row['score'],
-            pub_date=row['pub_date'],
+        parser.add_argument(
+            '--workers',
+            type=int,
+            default=3,
+            help='Количество процессов для параллельной загрузки COPY',
         )
-    print(f'{REVIEW} успешно импортировалось!')
 
-
-class Command(BaseCommand):
     def handle(self, *args, **options):
+        engine = options['engine']
+        if engine == 'copy' and connection.vendor != 'postgresql':
+            print(
+                'COPY поддерживается только в PostgreSQL, '
+                'используется пакетный импорт через ORM'
+            )
+            engine = 'orm'
         try:
-            import_users()
-            import_category()
-            import_genre()
-            import_title()
-            import_review()
-            import_comments()
+            if engine == 'copy':
+                copy_tables(options['data_dir'], options['workers'])
+            else:
+                Importer(options['data_dir'], options['batch_size']).run(
+                    TABLES
+                )
+            finish_import(TABLES)
         except Exception as error:
-            print(f'Ошибка импорта {error}')
+            raise CommandError(f'Ошибка импорта {error}')
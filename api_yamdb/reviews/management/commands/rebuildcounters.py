@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import invalidate_all
+from reviews.models import Review, Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики отзывов и комментариев'
+
+    def handle(self, *args, **options):
+        titles = Title.objects.all().update_ratings()
+        reviews = Review.objects.all().update_comments_counts()
+        invalidate_all()
+        print(
+            f'Счётчики пересчитаны для {titles} произведений '
+            f'и {reviews} отзывов'
+        )
@@ -0,0 +1,28 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.cache import bump_versions
+from reviews import leaderboards
+
+
+class Command(BaseCommand):
+    help = 'Пересобирает таблицы лидеров по рейтингам и отзывам за неделю'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=0,
+            help='Повторять пересборку каждые N секунд',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            rows = leaderboards.rebuild()
+            # Веб-процессы увидят новую версию только через общий кэш.
+            bump_versions(('titles',))
+            print(f'Таблицы лидеров пересобраны, строк: {rows}')
+            if not options['interval']:
+                return
+            time.sleep(options['interval'])
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import invalidate_all
+from reviews.models import Title
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает рейтинги всех произведений по отзывам'
+
+    def handle(self, *args, **options):
+        updated = Title.objects.all().update_ratings()
+        invalidate_all()
+        print(f'Рейтинги пересчитаны для {updated} произведений')
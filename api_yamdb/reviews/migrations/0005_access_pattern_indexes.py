@@ -0,0 +1,39 @@
+# Generated by Django 3.2 on 2026-10-18 04:53
+
+from django.db import migrations, models
+from django.db.models import Count, Min
+
+
+def remove_duplicate_genres(apps, schema_editor):
+    TitleGenre = apps.get_model('reviews', 'TitleGenre')
+    duplicates = TitleGenre.objects.values('genre', 'title').annotate(
+        keep=Min('id'),
+        total=Count('id'),
+    ).filter(total__gt=1)
+    for duplicate in duplicates:
+        TitleGenre.objects.filter(
+            genre=duplicate['genre'],
+            title=duplicate['title'],
+        ).exclude(id=duplicate['keep']).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_keyset_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            remove_duplicate_genres,
+            migrations.RunPython.noop,
+        ),
+        migrations.AddIndex(
+            model_name='title',
+            index=models.Index(fields=['category', '-year'], name='title_category_year_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlegenre',
+            constraint=models.UniqueConstraint(fields=('genre', 'title'), name='unique_genre_title'),
+        ),
+    ]
@@ -0,0 +1,72 @@
+# Generated by Django 3.2 on 2026-10-18 04:54
+
+import django.contrib.postgres.search
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+FORWARD_SQL = (
+    '''
+    CREATE FUNCTION reviews_title_search_vector() RETURNS trigger AS $$
+    BEGIN
+        NEW.search_vector :=
+            setweight(to_tsvector('pg_catalog.russian',
+                                  coalesce(NEW.name, '')), 'A')
+            || setweight(to_tsvector('pg_catalog.russian',
+                                     coalesce(NEW.description, '')), 'B');
+        RETURN NEW;
+    END
+    $$ LANGUAGE plpgsql
+    ''',
+    '''
+    CREATE TRIGGER reviews_title_search_vector_update
+    BEFORE INSERT OR UPDATE OF name, description, search_vector
+    ON reviews_title
+    FOR EACH ROW EXECUTE PROCEDURE reviews_title_search_vector()
+    ''',
+    'UPDATE reviews_title SET search_vector = NULL',
+    '''
+    CREATE INDEX title_search_vector_idx
+    ON reviews_title USING gin (search_vector)
+    ''',
+    '''
+    CREATE INDEX title_name_trgm_idx
+    ON reviews_title USING gin (name gin_trgm_ops)
+    ''',
+)
+
+BACKWARD_SQL = (
+    'DROP INDEX IF EXISTS title_name_trgm_idx',
+    'DROP INDEX IF EXISTS title_search_vector_idx',
+    'DROP TRIGGER IF EXISTS reviews_title_search_vector_update '
+    'ON reviews_title',
+    'DROP FUNCTION IF EXISTS reviews_title_search_vector()',
+)
+
+
+def run_postgres_sql(statements):
+    def run(apps, schema_editor):
+        if schema_editor.connection.vendor != 'postgresql':
+            return
+        for sql in statements:
+            schema_editor.execute(sql)
+    return run
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0005_access_pattern_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='title',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        TrigramExtension(),
+        migrations.RunPython(
+            run_postgres_sql(FORWARD_SQL),
+            run_postgres_sql(BACKWARD_SQL),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 3.2 on 2026-10-18 05:09
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_title_search'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TitleRank',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('board', models.CharField(choices=[('all', 'Все произведения'), ('category', 'Категория'), ('genre', 'Жанр'), ('week', 'Отзывы за неделю')], max_length=16, verbose_name='Таблица')),
+                ('group_id', models.PositiveIntegerField(default=0, verbose_name='Категория или жанр')),
+                ('rating', models.FloatField(default=0, verbose_name='Средняя оценка')),
+                ('reviews_count', models.PositiveIntegerField(default=0, verbose_name='Количество отзывов')),
+            ],
+            options={
+                'verbose_name': 'Место в таблице лидеров',
+                'verbose_name_plural': 'Таблицы лидеров',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['pub_date'], name='review_pub_date_idx'),
+        ),
+        migrations.AddField(
+            model_name='titlerank',
+            name='title',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ranks', to='reviews.title'),
+        ),
+        migrations.AddIndex(
+            model_name='titlerank',
+            index=models.Index(fields=['board', 'group_id', '-rating', '-reviews_count', 'title'], name='title_rank_rating_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='titlerank',
+            index=models.Index(fields=['board', 'group_id', '-reviews_count', 'title'], name='title_rank_reviews_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='titlerank',
+            constraint=models.UniqueConstraint(fields=('board', 'group_id', 'title'), name='unique_title_rank'),
+        ),
+    ]
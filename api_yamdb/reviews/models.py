@@ -1,13 +1,24 @@
+from django.contrib.postgres.search import (
+    SearchQuery,
+    SearchRank,
+    SearchVectorField,
+    TrigramSimilarity,
+)
 from django.core.validators import (
     MaxValueValidator,
     MinValueValidator,
 )
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import connections, models
+from django.db.models import Count, F, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Coalesce
 from django.utils import timezone
 
 from users.models import User
 
+# Конфигурация должна совпадать с триггером из миграции 0006.
+SEARCH_CONFIG = 'russian'
+
 
 class Genre(models.Model):
     name = models.CharField('Жанр', max_length=256)
@@ -33,6 +44,53 @@ class Category(models.Model):
         return self.name
 
 
+class TitleQuerySet(models.QuerySet):
+    def update_ratings(self):
+        reviews = Review.objects.filter(
+            title=OuterRef('pk'),
+        ).order_by().values('title')
+        return self.update(
+            rating_sum=Coalesce(
+                Subquery(reviews.annotate(total=Sum('score')).values('total')),
+                0,
+            ),
+            rating_count=Coalesce(
+                Subquery(reviews.annotate(total=Count('pk')).values('total')),
+                0,
+            ),
+        )
+
+    def search(self, text):
+        if connections[self.db].vendor != 'postgresql':
+            return self.filter(
+                Q(name__icontains=text) | Q(description__icontains=text)
+            )
+        query = SearchQuery(
+            text,
+            config=SEARCH_CONFIG,
+            search_type='websearch',
+        )
+        return self.annotate(
+            search_rank=SearchRank(F('search_vector'), query),
+            similarity=TrigramSimilarity('name', text),
+        ).filter(
+            Q(search_vector=query) | Q(name__trigram_similar=text)
+        ).order_by('-search_rank', '-similarity', 'id')
+
+
+class ReviewQuerySet(models.QuerySet):
+    def update_comments_counts(self):
+        comments = Comment.objects.filter(
+            review=OuterRef('pk'),
+        ).order_by().values('review')
+        return self.update(
+            comments_count=Coalesce(
+                Subquery(comments.annotate(total=Count('pk')).values('total')),
+                0,
+            ),
+        )
+
+
 class Title(models.Model):
     name = models.CharField('Произведение', max_length=256)
     category = models.ForeignKey(
@@ -54,11 +112,34 @@ class Title(models.Model):
         blank=True,
         null=True,
     )
+    rating_sum = models.PositiveIntegerField(
+        'Сумма оценок',
+        default=0,
+        editable=False,
+    )
+    rating_count = models.PositiveIntegerField(
+        'Количество оценок',
+        default=0,
+        editable=False,
+    )
+    search_vector = SearchVectorField(
+        null=True,
+        editable=False,
+    )
+
+    objects = TitleQuerySet.as_manager()
 
     class Meta:
         ordering = ['-year']
         verbose_name = 'Произведение'
         verbose_name_plural = 'Произведения'
+        indexes = [
+            models.Index(fields=['-year', 'id'], name='title_year_id_idx'),
+            models.Index(
+                fields=['category', '-year'],
+                name='title_category_year_idx',
+            ),
+        ]
 
     def clean_fields(self, exclude=None):
         super().clean_fields(exclude=None)
@@ -66,6 +147,12 @@ class Title(models.Model):
         if self.year > now:
             raise ValidationError(f'Год релиза не может быть больше {now}')
 
+    @property
+    def rating(self):
+        if not self.rating_count:
+            return None
+        return self.rating_sum // self.rating_count
+
     def __str__(self):
         return self.name
 
@@ -85,6 +172,12 @@ class TitleGenre(models.Model):
     class Meta:
         verbose_name = 'Жанры произведения'
         verbose_name_plural = 'Жанры произведения'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['genre', 'title'],
+                name='unique_genre_title',
+            ),
+        ]
 
     def __str__(self):
         return f'Произведение:"{self.title}". Жанр:{self.genre}'
@@ -113,6 +206,13 @@ class Review(models.Model):
         'Дата публикации',
         auto_now_add=True,
     )
+    comments_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+
+    objects = ReviewQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'Отзыв'
@@ -123,6 +223,23 @@ class Review(models.Model):
                 name='unique_review',
             ),
         ]
+        indexes = [
+            models.Index(
+                fields=['title', 'pub_date', 'id'],
+                name='review_title_pub_date_idx',
+            ),
+            models.Index(
+                fields=['pub_date'],
+                name='review_pub_date_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_score = instance.__dict__.get('score')
+        instance._loaded_title_id = instance.__dict__.get('title_id')
+        return instance
 
 
 class Comment(models.Model):
@@ -145,3 +262,75 @@ class Comment(models.Model):
     class Meta:
         verbose_name = 'Комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = [
+            models.Index(
+                fields=['review', 'pub_date', 'id'],
+                name='comment_review_pub_date_idx',
+            ),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_review_id = instance.__dict__.get('review_id')
+        return instance
+
+
+class TitleRank(models.Model):
+    """Строка таблицы лидеров: произведение в таблице board для
+    категории или жанра group_id (0 для общих таблиц)."""
+
+    ALL = 'all'
+    CATEGORY = 'category'
+    GENRE = 'genre'
+    WEEK = 'week'
+    BOARD_CHOICES = (
+        (ALL, 'Все произведения'),
+        (CATEGORY, 'Категория'),
+        (GENRE, 'Жанр'),
+        (WEEK, 'Отзывы за неделю'),
+    )
+
+    board = models.CharField(
+        'Таблица',
+        max_length=16,
+        choices=BOARD_CHOICES,
+    )
+    group_id = models.PositiveIntegerField(
+        'Категория или жанр',
+        default=0,
+    )
+    title = models.ForeignKey(
+        Title,
+        on_delete=models.CASCADE,
+        related_name='ranks',
+    )
+    rating = models.FloatField(
+        'Средняя оценка',
+        default=0,
+    )
+    reviews_count = models.PositiveIntegerField(
+        'Количество отзывов',
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = 'Место в таблице лидеров'
+        verbose_name_plural = 'Таблицы лидеров'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['board', 'group_id', 'title'],
+                name='unique_title_rank',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['board', 'group_id', '-rating', '-reviews_count',
+                        'title'],
+                name='title_rank_rating_idx',
+            ),
+            models.Index(
+                fields=['board', 'group_id', '-reviews_count', 'title'],
+                name='title_rank_reviews_idx',
+            ),
+        ]
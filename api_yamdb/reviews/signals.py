@@ -0,0 +1,94 @@
+from django.db.models import F
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from . import leaderboards
+from .models import Comment, Review, Title
+
+
+def change_rating(title_id, score, count):
+    Title.objects.filter(pk=title_id).update(
+        rating_sum=F('rating_sum') + score,
+        rating_count=F('rating_count') + count,
+    )
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_score = getattr(instance, '_loaded_score', None)
+    old_title_id = getattr(instance, '_loaded_title_id', None)
+    if created:
+        change_rating(instance.title_id, instance.score, 1)
+        if not leaderboards.update_title(instance.title_id):
+            leaderboards.refresh_titles([instance.title_id])
+        leaderboards.count_weekly_review(instance.title_id, 1)
+    elif old_score is None or old_title_id is None:
+        Title.objects.filter(pk=instance.title_id).update_ratings()
+        leaderboards.refresh_titles([instance.title_id])
+    elif old_title_id != instance.title_id:
+        change_rating(old_title_id, -old_score, -1)
+        change_rating(instance.title_id, instance.score, 1)
+        leaderboards.update_title(old_title_id)
+        leaderboards.refresh_titles([instance.title_id])
+    elif old_score != instance.score:
+        change_rating(instance.title_id, instance.score - old_score, 0)
+        leaderboards.update_title(instance.title_id)
+    instance._loaded_score = instance.score
+    instance._loaded_title_id = instance.title_id
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    score = getattr(instance, '_loaded_score', None)
+    title_id = getattr(instance, '_loaded_title_id', None)
+    if score is None or title_id is None:
+        score, title_id = instance.score, instance.title_id
+    change_rating(title_id, -score, -1)
+    leaderboards.update_title(title_id)
+    if leaderboards.is_this_week(instance):
+        leaderboards.count_weekly_review(title_id, -1)
+
+
+def change_comments_count(review_id, count):
+    Review.objects.filter(pk=review_id).update(
+        comments_count=F('comments_count') + count,
+    )
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_review_id = getattr(instance, '_loaded_review_id', None)
+    if created:
+        change_comments_count(instance.review_id, 1)
+    elif old_review_id is not None and old_review_id != instance.review_id:
+        change_comments_count(old_review_id, -1)
+        change_comments_count(instance.review_id, 1)
+    instance._loaded_review_id = instance.review_id
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    review_id = getattr(instance, '_loaded_review_id', None)
+    change_comments_count(review_id or instance.review_id, -1)
+
+
+@receiver(post_save, sender=Title)
+def title_saved(sender, instance, created, raw=False, **kwargs):
+    # Категория могла измениться; у нового произведения нет отзывов.
+    if not created and not raw:
+        leaderboards.refresh_titles([instance.pk])
+
+
+@receiver(m2m_changed, sender=Title.genre.through)
+def title_genres_changed(sender, instance, action, reverse, pk_set,
+                         **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        leaderboards.refresh_titles([instance.pk])
+    elif pk_set:
+        leaderboards.refresh_titles(pk_set)
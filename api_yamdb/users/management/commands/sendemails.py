@@ -0,0 +1,133 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from users.models import OutgoingEmail
+
+BATCH_SIZE = 100
+MAX_ATTEMPTS = 5
+RETRY_DELAY = 30
+# Сколько секунд забранные письма не выдаются другим процессам.
+CLAIM_TIMEOUT = 300
+
+
+def confirmation_message(user, connection):
+    return EmailMessage(
+        'Confirmation code from YaMDB',
+        default_token_generator.make_token(user),
+        settings.DEFAULT_FROM_EMAIL,
+        [user.email],
+        connection=connection,
+    )
+
+
+def claim(batch_size):
+    """Забирает пачку писем в короткой транзакции: до отправки срок
+    следующей попытки сдвигается, и другие процессы письма не выбирают.
+    Если процесс упадёт, письма вернутся в очередь по истечении срока.
+    """
+    with transaction.atomic():
+        emails = list(
+            OutgoingEmail.objects.due().select_related(
+                'user',
+            ).select_for_update(
+                skip_locked=True,
+                of=('self',),
+            ).order_by('next_attempt_at')[:batch_size]
+        )
+        OutgoingEmail.objects.filter(
+            pk__in=[email.pk for email in emails],
+        ).update(
+            next_attempt_at=timezone.now() + timedelta(seconds=CLAIM_TIMEOUT)
+        )
+    return emails
+
+
+def deliver(emails):
+    """Отправляет письма вне транзакции и возвращает ошибки по pk."""
+    errors = {}
+    sent = set()
+    try:
+        with get_connection() as connection:
+            for email in emails:
+                try:
+                    confirmation_message(email.user, connection).send()
+                except Exception as error:
+                    errors[email.pk] = str(error)
+                else:
+                    sent.add(email.pk)
+    except Exception as error:
+        # Соединение не открылось или оборвалось: неудачей считаются
+        # все неотправленные письма пачки.
+        for email in emails:
+            if email.pk not in sent:
+                errors[email.pk] = str(error)
+    return errors
+
+
+def send_batch(batch_size):
+    emails = claim(batch_size)
+    if not emails:
+        return 0, 0
+    errors = deliver(emails)
+    now = timezone.now()
+    for email in emails:
+        if email.pk in errors:
+            email.attempts += 1
+            email.last_error = errors[email.pk]
+            email.next_attempt_at = now + timedelta(
+                seconds=RETRY_DELAY * 2 ** (email.attempts - 1)
+            )
+        else:
+            email.sent_at = now
+    with transaction.atomic():
+        OutgoingEmail.objects.bulk_update(
+            emails,
+            ('attempts', 'last_error', 'next_attempt_at', 'sent_at'),
+        )
+        # Исчерпавшие попытки письма удаляются, чтобы повторная
+        # регистрация могла поставить новое.
+        OutgoingEmail.objects.filter(
+            pk__in=list(errors),
+            attempts__gte=MAX_ATTEMPTS,
+        ).delete()
+    return len(emails) - len(errors), len(errors)
+
+
+class Command(BaseCommand):
+    help = 'Отправляет письма из очереди исходящих писем'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=BATCH_SIZE,
+            help='Количество писем, отправляемых за один проход',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Пауза в секундах, если очередь пуста',
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Обработать одну пачку и завершиться',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            sent, failed = send_batch(options['batch_size'])
+            if sent or failed:
+                print(f'Отправлено писем: {sent}, ошибок: {failed}')
+            if options['once']:
+                return
+            if not sent and not failed:
+                time.sleep(options['interval'])
@@ -5,6 +5,8 @@ from django.conf import settings
 from django.contrib.auth.models import AbstractBaseUser, PermissionsMixin
 from django.core.validators import RegexValidator
 from django.db import models
+from django.db.models import Q
+from django.utils import timezone
 
 from .usermanager import UserManager
 
@@ -131,3 +133,52 @@ class User(PermissionsMixin, AbstractBaseUser):
             algorithm='HS256',
         )
         return token
+
+
+class OutgoingEmailQuerySet(models.QuerySet):
+    def enqueue(self, user):
+        # Повторная регистрация не ставит второе письмо, пока первое
+        # не отправлено.
+        self.bulk_create([self.model(user=user)], ignore_conflicts=True)
+
+    def due(self):
+        return self.filter(
+            sent_at__isnull=True,
+            next_attempt_at__lte=timezone.now(),
+        )
+
+
+class OutgoingEmail(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='outgoing_emails',
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+
+    objects = OutgoingEmailQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = 'Исходящее письмо'
+        verbose_name_plural = 'Исходящие письма'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user'],
+                condition=Q(sent_at__isnull=True),
+                name='unique_pending_email',
+            ),
+        ]
+        indexes = [
+            models.Index(
+                fields=['next_attempt_at'],
+                condition=Q(sent_at__isnull=True),
+                name='pending_email_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'Письмо для {self.user}'
@@ -0,0 +1,91 @@
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.core.cache import caches
+
+from api_yamdb.metrics import AUTH_CACHE
+
+DEFAULTS = {
+    'MAX_SIZE': 10000,
+    'TTL': 60,
+    'SHARED_CACHE': None,
+    'SHARED_TTL': 300,
+}
+
+
+class UserCache:
+    key_prefix = 'users:user:'
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = OrderedDict()
+
+    @property
+    def config(self):
+        return {**DEFAULTS, **getattr(settings, 'AUTH_USER_CACHE', {})}
+
+    @property
+    def shared(self):
+        alias = self.config['SHARED_CACHE']
+        if alias is None:
+            return None
+        return caches[alias]
+
+    def get(self, user_id):
+        now = time.monotonic()
+        with self._lock:
+            entry = self._local.get(user_id)
+            if entry is not None:
+                expires, user = entry
+                if expires > now:
+                    self._local.move_to_end(user_id)
+                    AUTH_CACHE.inc(result='hit')
+                    return copy.copy(user)
+                del self._local[user_id]
+        shared = self.shared
+        user = None
+        if shared is not None:
+            user = shared.get(f'{self.key_prefix}{user_id}')
+        if user is None:
+            AUTH_CACHE.inc(result='miss')
+            return None
+        AUTH_CACHE.inc(result='shared_hit')
+        self._store_local(user)
+        return copy.copy(user)
+
+    def set(self, user):
+        self._store_local(copy.copy(user))
+        shared = self.shared
+        if shared is not None:
+            shared.set(
+                f'{self.key_prefix}{user.pk}',
+                user,
+                self.config['SHARED_TTL'],
+            )
+
+    def delete(self, user_id):
+        with self._lock:
+            self._local.pop(user_id, None)
+        shared = self.shared
+        if shared is not None:
+            shared.delete(f'{self.key_prefix}{user_id}')
+
+    def clear(self):
+        with self._lock:
+            self._local.clear()
+
+    def _store_local(self, user):
+        config = self.config
+        if config['MAX_SIZE'] <= 0:
+            return
+        with self._lock:
+            self._local[user.pk] = (time.monotonic() + config['TTL'], user)
+            self._local.move_to_end(user.pk)
+            while len(self._local) > config['MAX_SIZE']:
+                self._local.popitem(last=False)
+
+
+user_cache = UserCache()
@@ -0,0 +1,72 @@
+import statistics
+import sys
+import time
+from os.path import abspath, dirname
+
+import pytest
+
+root_dir = dirname(dirname(abspath(__file__)))
+sys.path.append(root_dir)
+
+try:
+    import pytest_benchmark
+except ImportError:
+    pytest_benchmark = None
+
+from reviews.management.commands.generatedata import generate  # noqa: E402
+
+ROUNDS = 20
+
+# Размер набора данных для микробенчмарков.
+DATASET = {
+    'titles': 200,
+    'genres': 10,
+    'categories': 5,
+    'users': 50,
+    'reviews': 10,
+    'comments': 1,
+}
+
+results = []
+
+
+@pytest.fixture(scope='session')
+def django_db_setup(django_db_setup, django_db_blocker):
+    with django_db_blocker.unblock():
+        generate(**DATASET)
+
+
+class Benchmark:
+    """Замена фикстуры benchmark из pytest-benchmark, если он не
+    установлен: прогрев и ROUNDS замеров, итог в конце прогона."""
+
+    def __init__(self, name):
+        self.name = name
+
+    def __call__(self, function, *args, **kwargs):
+        result = function(*args, **kwargs)
+        timings = []
+        for _ in range(ROUNDS):
+            start = time.perf_counter()
+            function(*args, **kwargs)
+            timings.append(time.perf_counter() - start)
+        results.append((self.name, timings))
+        return result
+
+
+if pytest_benchmark is None:
+
+    @pytest.fixture
+    def benchmark(request):
+        return Benchmark(request.node.nodeid.split('::', 1)[-1])
+
+    def pytest_terminal_summary(terminalreporter):
+        if not results:
+            return
+        terminalreporter.section('benchmarks, ms')
+        for name, timings in results:
+            terminalreporter.write_line(
+                f'{name:<50} min {min(timings) * 1000:9.3f} '
+                f'median {statistics.median(timings) * 1000:9.3f} '
+                f'mean {statistics.mean(timings) * 1000:9.3f}'
+            )
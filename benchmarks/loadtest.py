@@ -0,0 +1,289 @@
+"""Нагрузочный прогон журнала запросов через WSGI-приложение в том же
+процессе, без сети и сервера.
+
+Журнал — JSON Lines, по запросу в строке:
+
+    {"method": "GET", "path": "/api/v1/titles/", "user": null}
+    {"method": "POST", "path": "/api/v1/titles/1/reviews/1/comments/",
+     "user": "bench1", "data": {"text": "..."}, "name": "comment create"}
+
+user — имя пользователя, запрос идёт с его JWT; name группирует запросы
+в отчёте, по умолчанию это метод и путь. Адреса рассчитаны на данные
+из manage.py generatedata. Базовый отчёт записывается на той же СУБД,
+на которой идёт сравнение: отчёт из другого окружения не принимается.
+
+    python benchmarks/loadtest.py benchmarks/requests.jsonl --repeat 20 \\
+        --save benchmarks/baseline.json
+    python benchmarks/loadtest.py benchmarks/requests.jsonl \\
+        --baseline benchmarks/baseline.json
+"""
+import argparse
+import io
+import json
+import os
+import platform
+import sys
+import time
+from collections import defaultdict
+from os.path import abspath, dirname, join
+from wsgiref.util import setup_testing_defaults
+
+sys.path.insert(0, join(dirname(dirname(abspath(__file__))), 'api_yamdb'))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'api_yamdb.settings')
+
+PERCENTILES = (50, 90, 99)
+
+# Метрики отчёта: (путь к значению, чем больше, тем лучше).
+COMPARED = (
+    (('throughput',), True),
+    (('latency_ms', 'p50'), False),
+    (('latency_ms', 'p90'), False),
+    (('latency_ms', 'p99'), False),
+)
+
+
+def read_log(path):
+    with open(path, encoding='utf-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+def percentile(values, percent):
+    ordered = sorted(values)
+    index = max(0, -(-len(ordered) * percent // 100) - 1)
+    return ordered[int(index)]
+
+
+def latency(timings):
+    milliseconds = [timing * 1000 for timing in timings]
+    summary = {
+        f'p{percent}': round(percentile(milliseconds, percent), 3)
+        for percent in PERCENTILES
+    }
+    summary['max'] = round(max(milliseconds), 3)
+    return summary
+
+
+class LoadDriver:
+
+    def __init__(self, application, entries):
+        self.application = application
+        self.entries = entries
+        self.tokens = {}
+
+    def get_token(self, username):
+        if username not in self.tokens:
+            from users.models import User
+
+            self.tokens[username] = User.objects.get(username=username).token
+        return self.tokens[username]
+
+    def make_environ(self, entry):
+        path, _, query = entry['path'].partition('?')
+        data = entry.get('data')
+        body = b'' if data is None else json.dumps(data).encode()
+        environ = {
+            'REQUEST_METHOD': entry.get('method', 'GET').upper(),
+            'PATH_INFO': path,
+            'QUERY_STRING': query,
+            'SERVER_NAME': 'localhost',
+            'HTTP_HOST': 'localhost',
+            'CONTENT_TYPE': 'application/json',
+            'CONTENT_LENGTH': str(len(body)),
+            'wsgi.input': io.BytesIO(body),
+        }
+        if entry.get('user'):
+            environ['HTTP_AUTHORIZATION'] = (
+                f'Bearer {self.get_token(entry["user"])}'
+            )
+        setup_testing_defaults(environ)
+        return environ
+
+    def request(self, entry):
+        statuses = []
+
+        def start_response(status, headers, exc_info=None):
+            statuses.append(int(status.split()[0]))
+
+        environ = self.make_environ(entry)
+        start = time.perf_counter()
+        response = self.application(environ, start_response)
+        try:
+            for chunk in response:
+                pass
+        finally:
+            if hasattr(response, 'close'):
+                response.close()
+        return statuses[0], time.perf_counter() - start
+
+    def run(self, repeat, warmup):
+        for _ in range(warmup):
+            for entry in self.entries:
+                self.request(entry)
+        timings = defaultdict(list)
+        statuses = defaultdict(int)
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for entry in self.entries:
+                status, duration = self.request(entry)
+                name = entry.get('name') or (
+                    f'{entry.get("method", "GET").upper()} {entry["path"]}'
+                )
+                timings[name].append(duration)
+                statuses[f'{status // 100}xx'] += 1
+        return timings, statuses, time.perf_counter() - start
+
+
+def database_version(connection):
+    if connection.vendor == 'postgresql':
+        connection.ensure_connection()
+        return str(connection.pg_version)
+    return getattr(connection.Database, 'sqlite_version', '')
+
+
+def environment():
+    import django
+    from django.db import connection
+
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'database_version': database_version(connection),
+        'machine': platform.machine(),
+    }
+
+
+def environment_changes(report, baseline):
+    """Различия окружений: задержки на разных СУБД и версиях
+    несравнимы."""
+    old = baseline.get('environment', {})
+    new = report['environment']
+    return [
+        f'{key}: {old.get(key)} -> {new[key]}'
+        for key in new if old.get(key) != new[key]
+    ]
+
+
+def make_report(timings, statuses, seconds):
+    all_timings = [
+        timing for endpoint in timings.values() for timing in endpoint
+    ]
+    return {
+        'environment': environment(),
+        'requests': len(all_timings),
+        'statuses': dict(sorted(statuses.items())),
+        'seconds': round(seconds, 3),
+        'throughput': round(len(all_timings) / seconds, 2),
+        'latency_ms': latency(all_timings),
+        'endpoints': {
+            name: {'requests': len(values), 'latency_ms': latency(values)}
+            for name, values in timings.items()
+        },
+    }
+
+
+def lookup(report, path):
+    for key in path:
+        report = report[key]
+    return report
+
+
+def compare(report, baseline, tolerance):
+    """Печатает изменения относительно базового отчёта и возвращает
+    метрики, ухудшившиеся больше чем на tolerance, и классы статусов
+    кроме 2xx, которых не было в базовом отчёте."""
+    compared = [(('total',) + path, path, higher) for path, higher in COMPARED]
+    for name in report['endpoints']:
+        if name in baseline['endpoints']:
+            compared.extend(
+                ((name, percent), ('endpoints', name, 'latency_ms', percent),
+                 False)
+                for percent in ('p50', 'p99')
+            )
+    regressions = []
+    for label, path, higher in compared:
+        old, new = lookup(baseline, path), lookup(report, path)
+        change = (new - old) / old if old else 0.0
+        worse = -change if higher else change
+        line = f'{" ".join(label):<60} {old:>10} -> {new:>10} {change:+.1%}'
+        if worse > tolerance:
+            regressions.append(line)
+            line += '  !'
+        print(line)
+    statuses = sorted(set(report['statuses']) | set(baseline['statuses']))
+    for status in statuses:
+        old = baseline['statuses'].get(status, 0)
+        new = report['statuses'].get(status, 0)
+        line = f'{"statuses " + status:<60} {old:>10} -> {new:>10}'
+        # Ошибки быстрее успешных ответов: замеры задержки их не ловят.
+        if status != '2xx' and new and not old:
+            regressions.append(line)
+            line += '  !'
+        print(line)
+    return regressions
+
+
+def print_report(report):
+    print(
+        f'{report["requests"]} запросов за {report["seconds"]} с, '
+        f'{report["throughput"]} запросов/с, статусы {report["statuses"]}'
+    )
+    print('Задержка, мс:', report['latency_ms'])
+    for name, endpoint in report['endpoints'].items():
+        print(f'  {name:<58} {endpoint["latency_ms"]}')
+
+
+def parse_args(args=None):
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[0])
+    parser.add_argument('log', help='Журнал запросов в формате JSON Lines')
+    parser.add_argument('--repeat', type=int, default=20,
+                        help='Сколько раз проиграть журнал')
+    parser.add_argument('--warmup', type=int, default=1,
+                        help='Прогревочные проходы без замеров')
+    parser.add_argument('--save', help='Записать отчёт в JSON-файл')
+    parser.add_argument('--baseline', help='Сравнить с отчётом из файла')
+    parser.add_argument(
+        '--tolerance', type=float, default=0.15,
+        help='Допустимое ухудшение метрики относительно базового отчёта',
+    )
+    parser.add_argument(
+        '--ignore-environment', action='store_true',
+        help='Сравнивать с базовым отчётом из другого окружения',
+    )
+    return parser.parse_args(args)
+
+
+def main(args=None):
+    options = parse_args(args)
+    from django.core.wsgi import get_wsgi_application
+
+    driver = LoadDriver(get_wsgi_application(), read_log(options.log))
+    report = make_report(*driver.run(options.repeat, options.warmup))
+    print_report(report)
+    if options.save:
+        with open(options.save, 'w', encoding='utf-8') as file:
+            json.dump(report, file, ensure_ascii=False, indent=2)
+            file.write('\n')
+    if options.baseline:
+        with open(options.baseline, encoding='utf-8') as file:
+            baseline = json.load(file)
+        changes = environment_changes(report, baseline)
+        if changes:
+            print('Базовый отчёт снят в другом окружении:')
+            print('\n'.join(changes))
+            if not options.ignore_environment:
+                print(
+                    'Сравнение отменено: запишите базовый отчёт с --save '
+                    'на целевой СУБД или укажите --ignore-environment'
+                )
+                return 2
+        regressions = compare(report, baseline, options.tolerance)
+        if regressions:
+            print(f'Ухудшение больше {options.tolerance:.0%}:')
+            print('\n'.join(regressions))
+            return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
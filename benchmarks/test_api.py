@@ -0,0 +1,90 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from api.backends import JWTAuthentication
+from api.filters import TitleFilter
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleSerializer,
+)
+from reviews.models import Comment, Review, Title, User
+from users.usercache import user_cache
+
+
+def titles_queryset():
+    return Title.objects.defer('search_vector').select_related(
+        'category'
+    ).prefetch_related('genre')
+
+
+@pytest.mark.django_db
+class TestSerializers:
+
+    def test_titles(self, benchmark):
+        titles = list(titles_queryset()[:100])
+        data = benchmark(lambda: TitleSerializer(titles, many=True).data)
+        assert len(data) == 100
+
+    def test_reviews(self, benchmark):
+        reviews = list(Review.objects.select_related('author')[:100])
+        data = benchmark(lambda: ReviewSerializer(reviews, many=True).data)
+        assert len(data) == 100
+
+    def test_comments(self, benchmark):
+        comments = list(Comment.objects.select_related('author')[:100])
+        data = benchmark(lambda: CommentSerializer(comments, many=True).data)
+        assert len(data) == 100
+
+
+@pytest.mark.django_db
+class TestAuthentication:
+
+    @pytest.fixture
+    def request_with_token(self):
+        user = User.objects.get(username='bench1')
+        return APIRequestFactory().get(
+            '/', HTTP_AUTHORIZATION=f'Bearer {user.token}'
+        )
+
+    def test_cached_user(self, benchmark, request_with_token):
+        authentication = JWTAuthentication()
+        user, token = benchmark(
+            authentication.authenticate, request_with_token
+        )
+        assert user.username == 'bench1'
+
+    def test_uncached_user(self, benchmark, request_with_token):
+        authentication = JWTAuthentication()
+
+        def authenticate():
+            user_cache.clear()
+            return authentication.authenticate(request_with_token)
+
+        user, token = benchmark(authenticate)
+        assert user.username == 'bench1'
+
+
+@pytest.mark.django_db
+class TestFilters:
+
+    @pytest.mark.parametrize('params', [
+        {'genre': 'genre-1'},
+        {'category': 'category-1', 'year': 2000},
+        {'name': 'дом'},
+    ], ids=['genre', 'category-year', 'name'])
+    def test_titles(self, benchmark, params):
+        titles = benchmark(
+            lambda: list(TitleFilter(params, titles_queryset()).qs[:10])
+        )
+        assert len(titles) <= 10
+
+    @pytest.mark.skipif(
+        connection.vendor != 'postgresql',
+        reason='Полнотекстовый поиск работает только в PostgreSQL',
+    )
+    def test_search(self, benchmark):
+        benchmark(
+            lambda: list(TitleFilter({'search': 'дом'}, titles_queryset()).qs)
+        )
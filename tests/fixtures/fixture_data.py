@@ -0,0 +1,54 @@
+import pytest
+
+from reviews.models import Category, Genre, Review, Title, TitleGenre
+
+
+@pytest.fixture
+def categories():
+    return [
+        Category.objects.create(name=f'Категория {i}', slug=f'category-{i}')
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def genres():
+    return [
+        Genre.objects.create(name=f'Жанр {i}', slug=f'genre-{i}')
+        for i in range(3)
+    ]
+
+
+@pytest.fixture
+def titles(categories, genres):
+    titles = []
+    for i in range(12):
+        title = Title.objects.create(
+            name=f'Произведение {i}',
+            year=1990 + i,
+            description=f'Описание {i}',
+            category=categories[i % len(categories)],
+        )
+        TitleGenre.objects.bulk_create(
+            TitleGenre(title=title, genre=genre) for genre in genres
+        )
+        titles.append(title)
+    return titles
+
+
+@pytest.fixture
+def reviews(titles, django_user_model):
+    title = titles[0]
+    reviews = []
+    for i in range(12):
+        author = django_user_model.objects.create(
+            username=f'reviewer{i}',
+            email=f'reviewer{i}@yamdb.fake',
+        )
+        reviews.append(Review.objects.create(
+            author=author,
+            title=title,
+            text=f'Отзыв {i}',
+            score=i % 10 + 1,
+        ))
+    return reviews
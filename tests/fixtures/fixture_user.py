@@ -0,0 +1,62 @@
+import pytest
+from django.core.cache import cache
+from rest_framework.test import APIClient
+
+from users.usercache import user_cache
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    cache.clear()
+    user_cache.clear()
+
+
+@pytest.fixture
+def admin(django_user_model):
+    return django_user_model.objects.create(
+        username='TestAdmin',
+        email='admin@yamdb.fake',
+        role='admin',
+        bio='admin bio',
+    )
+
+
+@pytest.fixture
+def user(django_user_model):
+    return django_user_model.objects.create(
+        username='TestUser',
+        email='user@yamdb.fake',
+        role='user',
+        bio='user bio',
+    )
+
+
+@pytest.fixture
+def admin_client(admin):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {admin.token}')
+    return client
+
+
+@pytest.fixture
+def user_client(user):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {user.token}')
+    return client
+
+
+@pytest.fixture
+def moderator(django_user_model):
+    return django_user_model.objects.create(
+        username='TestModerator',
+        email='moderator@yamdb.fake',
+        role='moderator',
+        bio='moderator bio',
+    )
+
+
+@pytest.fixture
+def moderator_client(moderator):
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f'Bearer {moderator.token}')
+    return client
@@ -0,0 +1,105 @@
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.core.wsgi import get_wsgi_application
+
+from benchmarks.loadtest import (
+    LoadDriver,
+    compare,
+    environment_changes,
+    make_report,
+)
+from reviews.models import Comment, Review, Title, TitleRank
+
+SCALE = {'titles': 5, 'genres': 3, 'categories': 2, 'users': 4,
+         'reviews': 3, 'comments': 2}
+
+
+def generate(**options):
+    call_command('generatedata', **SCALE, **options)
+
+
+def snapshot():
+    return (
+        list(Title.objects.values_list('id', 'name', 'year', 'category')),
+        list(Review.objects.values_list('id', 'title', 'score', 'text')),
+        list(Comment.objects.values_list('id', 'review', 'text')),
+    )
+
+
+@pytest.mark.django_db
+class TestGenerateData:
+
+    def test_generate(self):
+        generate()
+        assert Title.objects.count() == 5
+        assert Review.objects.count() == 15
+        assert Comment.objects.count() == 30
+        title = Title.objects.get(pk=1)
+        assert title.rating_count == 3, (
+            'Проверьте, что generatedata пересчитывает счётчики'
+        )
+        assert Review.objects.get(pk=1).comments_count == 2
+        assert TitleRank.objects.exists()
+
+    def test_reproducible(self):
+        generate(seed=7)
+        first = snapshot()
+        with pytest.raises(CommandError):
+            generate(seed=7)
+        generate(seed=7, clear=True)
+        assert snapshot() == first, (
+            'Проверьте, что при одном seed данные совпадают'
+        )
+
+    def test_clear_keeps_other_users(self, django_user_model):
+        for username in ('benchmark', 'bench_fan', 'bench1x'):
+            django_user_model.objects.create(
+                username=username, email=f'{username}@yamdb.fake'
+            )
+        generate()
+        generate(clear=True)
+        assert django_user_model.objects.filter(
+            username__in=('benchmark', 'bench_fan', 'bench1x')
+        ).count() == 3, (
+            'Проверьте, что generatedata --clear удаляет только '
+            'сгенерированных пользователей'
+        )
+        assert django_user_model.objects.filter(
+            username__startswith='bench'
+        ).count() == 3 + SCALE['users'] + 1
+
+
+@pytest.mark.django_db
+class TestLoadDriver:
+
+    def test_replay(self):
+        generate()
+        entries = [
+            {'method': 'GET', 'path': '/api/v1/titles/?limit=2'},
+            {'method': 'POST', 'path': '/api/v1/titles/1/reviews/1/comments/',
+             'user': 'bench1', 'data': {'text': 'Текст'}, 'name': 'comment'},
+        ]
+        driver = LoadDriver(get_wsgi_application(), entries)
+        report = make_report(*driver.run(repeat=2, warmup=0))
+        assert report['statuses'] == {'2xx': 4}
+        assert set(report['endpoints']) == {
+            'GET /api/v1/titles/?limit=2', 'comment',
+        }
+        assert Review.objects.get(pk=1).comments_count == 4
+        slower = dict(report, throughput=report['throughput'] / 2)
+        assert compare(slower, report, 0.15) and not compare(
+            report, report, 0.15
+        ), 'Проверьте, что сравнение с базовым отчётом находит ухудшение'
+        failing = dict(report, statuses={'2xx': 3, '5xx': 1})
+        assert compare(failing, report, 0.15), (
+            'Проверьте, что ошибки, которых не было в базовом отчёте, '
+            'считаются ухудшением'
+        )
+        assert not environment_changes(report, report)
+        other = dict(report, environment=dict(
+            report['environment'], database='postgresql'
+        ))
+        assert environment_changes(report, other), (
+            'Проверьте, что отчёт с другой СУБД не принимается как базовый'
+        )
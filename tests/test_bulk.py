@@ -0,0 +1,164 @@
+import json
+
+import pytest
+from django.db.models import QuerySet
+
+from reviews.models import Category, Title
+from tests.test_queries import run_counting_queries
+
+
+@pytest.mark.django_db
+class TestBulkSlugUpsert:
+    url = '/api/v1/categories/bulk/'
+
+    def test_upsert(self, admin_client, categories):
+        data = [
+            {'name': 'Переименована', 'slug': categories[0].slug},
+            {'name': categories[1].name, 'slug': categories[1].slug},
+            {'name': 'Новая', 'slug': 'new'},
+            {'slug': 'no-name'},
+            {'name': 'Повтор', 'slug': 'new'},
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'updated', 'unchanged', 'created', 'error', 'error',
+        ], 'Проверьте, что bulk возвращает результат для каждого объекта'
+        assert 'name' in results[3]['errors']
+        assert Category.objects.get(slug=categories[0].slug).name == (
+            'Переименована'
+        )
+        assert Category.objects.get(slug='new').name == 'Новая'
+        assert not Category.objects.filter(slug='no-name').exists()
+
+    @pytest.mark.parametrize('count', [1, 50])
+    def test_fixed_queries(self, admin_client, genres, count):
+        data = [
+            {'name': f'Жанр {i}', 'slug': f'bulk-{i}'} for i in range(count)
+        ]
+        data.append({'name': 'Переименован', 'slug': 'genre-0'})
+        admin_client.get('/api/v1/users/me/')
+        response, queries = run_counting_queries(lambda: admin_client.post(
+            '/api/v1/genres/bulk/', data=data, format='json'
+        ))
+        assert response.status_code == 200
+        # Поиск существующих, вставка, чтение вставленных и обновление.
+        assert len(queries) == 4, queries
+
+    def test_concurrent_insert_is_reported(self, admin_client, monkeypatch):
+        bulk_create = QuerySet.bulk_create
+
+        def concurrent(queryset, objs, **kwargs):
+            # Параллельный запрос успел вставить ту же категорию.
+            bulk_create(queryset, [Category(name='Чужая', slug='race')])
+            return bulk_create(queryset, objs, **kwargs)
+
+        monkeypatch.setattr(QuerySet, 'bulk_create', concurrent)
+        response = admin_client.post(
+            self.url,
+            data=[
+                {'name': 'Гонка', 'slug': 'race'},
+                {'name': 'Новая', 'slug': 'new'},
+            ],
+            format='json',
+        )
+        assert [result['status'] for result in response.json()] == [
+            'updated', 'created',
+        ], 'Проверьте, что bulk сообщает, какие строки вставлены на самом деле'
+        assert Category.objects.get(slug='race').name == 'Гонка'
+
+    def test_reserved_slug(self, admin_client):
+        data = {'name': 'Bulk', 'slug': 'bulk'}
+        response = admin_client.post(
+            '/api/v1/categories/', data=data, format='json'
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что slug bulk зарезервирован'
+        )
+        response = admin_client.post(self.url, data=[data], format='json')
+        assert response.json()[0]['status'] == 'error'
+        response = admin_client.post(
+            '/api/v1/genres/', data=data, format='json'
+        )
+        assert response.status_code == 400
+
+    def test_permissions_and_payload(self, client, user_client, admin_client):
+        data = [{'name': 'Категория', 'slug': 'category'}]
+        response = client.post(
+            self.url, data=json.dumps(data), content_type='application/json'
+        )
+        assert response.status_code == 401
+        assert user_client.post(
+            self.url, data=data, format='json'
+        ).status_code == 403
+        response = admin_client.post(self.url, data=data[0], format='json')
+        assert response.status_code == 400
+        response = admin_client.post(self.url, data=data * 1001, format='json')
+        assert response.status_code == 400
+
+
+@pytest.mark.django_db
+class TestBulkTitleUpsert:
+    url = '/api/v1/titles/bulk/'
+
+    def test_upsert(self, admin_client, client, titles, genres, categories):
+        title = titles[0]
+        assert client.get(f'/api/v1/titles/{title.id}/').json()['name'] == (
+            title.name
+        )
+        data = [
+            {
+                'name': 'Новое',
+                'year': 2001,
+                'category': categories[1].slug,
+                'genre': [genres[0].slug, genres[2].slug],
+            },
+            {
+                'id': title.id,
+                'name': 'Обновлённое',
+                'year': title.year,
+                'category': title.category.slug,
+                'genre': [genres[1].slug],
+            },
+            {
+                'id': titles[1].id,
+                'name': titles[1].name,
+                'year': titles[1].year,
+                'category': titles[1].category.slug,
+                'genre': [genre.slug for genre in genres],
+            },
+            {
+                'name': 'С ошибкой',
+                'year': 2001,
+                'category': 'unknown',
+                'genre': ['unknown'],
+            },
+            {
+                'id': 0,
+                'name': 'Нет такого',
+                'year': 2001,
+                'category': categories[0].slug,
+                'genre': [],
+            },
+        ]
+        response = admin_client.post(self.url, data=data, format='json')
+        assert response.status_code == 200
+        results = response.json()
+        assert [result['status'] for result in results] == [
+            'created', 'updated', 'unchanged', 'error', 'error',
+        ]
+        assert set(results[3]['errors']) == {'category', 'genre'}
+        assert 'id' in results[4]['errors']
+        created = Title.objects.get(id=results[0]['id'])
+        assert created.category == categories[1]
+        assert {genre.slug for genre in created.genre.all()} == {
+            genres[0].slug, genres[2].slug,
+        }
+        assert [genre.slug for genre in Title.objects.get(
+            id=title.id
+        ).genre.all()] == [genres[1].slug]
+        detail = client.get(f'/api/v1/titles/{title.id}/').json()
+        assert detail['name'] == 'Обновлённое', (
+            'Проверьте, что bulk сбрасывает кэш изменённых произведений'
+        )
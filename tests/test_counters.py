@@ -0,0 +1,72 @@
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Comment, Review, Title
+
+
+def count_queries(queries):
+    return [
+        query['sql'] for query in queries if 'COUNT(' in query['sql']
+    ]
+
+
+@pytest.mark.django_db
+class TestCounters:
+
+    def test_review_list_count(self, client, reviews):
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.json()['count'] == len(reviews)
+        assert not count_queries(context.captured_queries), (
+            'Проверьте, что количество отзывов берётся из счётчика '
+            'произведения, а не из COUNT(*)'
+        )
+        response = client.get(f'/api/v1/titles/{reviews[0].title_id}/')
+        assert response.json()['reviews_count'] == len(reviews)
+
+    def test_comment_counter(self, user_client, admin_client, reviews):
+        review = reviews[0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        for text in ('Первый', 'Второй'):
+            user_client.post(url, data={'text': text})
+        Review.objects.get(pk=review.pk).comments.first().delete()
+        review.refresh_from_db()
+        assert review.comments_count == 1, (
+            'Проверьте, что счётчик комментариев обновляется при создании '
+            'и удалении комментариев'
+        )
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert response.json()['count'] == 1
+        assert not count_queries(context.captured_queries)
+        response = admin_client.get(
+            f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        )
+        assert response.json()['comments_count'] == 1
+
+    def test_comment_moved(self, user, reviews):
+        comment = Comment.objects.create(
+            author=user, review=reviews[0], text='Комментарий'
+        )
+        comment = Comment.objects.get(pk=comment.pk)
+        comment.review = reviews[1]
+        comment.save()
+        assert [
+            Review.objects.get(pk=review.pk).comments_count
+            for review in reviews[:2]
+        ] == [0, 1]
+
+    def test_rebuild(self, user, reviews):
+        Comment.objects.create(author=user, review=reviews[0], text='1')
+        Review.objects.update(comments_count=5)
+        Title.objects.update(rating_sum=0, rating_count=0)
+        call_command('rebuildcounters')
+        assert Review.objects.get(pk=reviews[0].pk).comments_count == 1
+        assert Review.objects.get(pk=reviews[1].pk).comments_count == 0
+        title = Title.objects.get(pk=reviews[0].title_id)
+        assert title.rating_count == len(reviews), (
+            'Проверьте, что rebuildcounters пересчитывает счётчики'
+        )
@@ -0,0 +1,67 @@
+import pytest
+from django.db import connection
+from rest_framework.test import APIRequestFactory
+
+from api.pagination import PubDatePagination, YearPagination
+from api.views import CommentViewSet, ReviewViewSet, TitleViewSet
+
+
+def view_queryset(viewset, **kwargs):
+    # Запрос вьюхи зависит от request (?fields=), как в настоящем вызове.
+    view = viewset(
+        action_map={'get': 'list'}, kwargs=kwargs, format_kwarg=None
+    )
+    view.request = view.initialize_request(APIRequestFactory().get('/'))
+    return view.get_queryset()
+
+
+def assert_uses_index(queryset):
+    # Запрос собирается на любой СУБД, план проверяется только на
+    # PostgreSQL.
+    if connection.vendor != 'postgresql':
+        pytest.skip('EXPLAIN проверяется только на PostgreSQL')
+    # На маленьких таблицах планировщик выбирает Seq Scan, поэтому
+    # запрещаем его: если подходящего индекса нет, план всё равно
+    # останется последовательным чтением.
+    with connection.cursor() as cursor:
+        cursor.execute('SET LOCAL enable_seqscan = off')
+    plan = queryset.explain()
+    assert 'Seq Scan' not in plan, (
+        f'Запрос выполняется последовательным чтением таблицы:\n{plan}'
+    )
+
+
+@pytest.mark.django_db
+class TestIndexUsage:
+
+    def test_titles_list(self, titles):
+        queryset = view_queryset(TitleViewSet).order_by(
+            *YearPagination.keyset_ordering
+        )
+        assert_uses_index(queryset[:10])
+
+    def test_titles_by_category(self, titles):
+        queryset = view_queryset(TitleViewSet).filter(
+            category=titles[0].category
+        )
+        assert_uses_index(queryset.order_by('-year')[:10])
+
+    def test_titles_by_genre(self, titles, genres):
+        queryset = view_queryset(TitleViewSet).filter(
+            genre__slug=genres[0].slug
+        )
+        assert_uses_index(queryset[:10])
+
+    def test_reviews_list(self, reviews):
+        queryset = view_queryset(
+            ReviewViewSet, title_id=reviews[0].title_id
+        ).order_by(*PubDatePagination.keyset_ordering)
+        assert_uses_index(queryset[:10])
+
+    def test_comments_list(self, reviews):
+        queryset = view_queryset(
+            CommentViewSet,
+            title_id=reviews[0].title_id,
+            review_id=reviews[0].id,
+        ).order_by(*PubDatePagination.keyset_ordering)
+        assert_uses_index(queryset[:10])
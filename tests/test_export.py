@@ -0,0 +1,72 @@
+import csv
+import io
+import json
+
+import pytest
+
+from reviews.csvdata import TABLES, USERS
+from reviews.management.commands.importdb import Importer, finish_import
+from reviews.models import Category, Genre, Title, TitleGenre
+
+
+def export(client, table, fmt='csv'):
+    response = client.get(f'/api/v1/export/{table}/', {'fmt': fmt})
+    assert response.status_code == 200
+    assert response.streaming, (
+        'Проверьте, что выгрузка отдаётся StreamingHttpResponse'
+    )
+    return b''.join(response.streaming_content).decode()
+
+
+def rows(table):
+    attnames = [attname for column, attname in table.columns]
+    return sorted(table.model.objects.values_list(*attnames))
+
+
+@pytest.mark.django_db
+class TestExport:
+
+    def test_csv(self, admin_client, reviews):
+        rows = list(csv.DictReader(io.StringIO(export(admin_client, 'review'))))
+        assert len(rows) == len(reviews)
+        assert list(rows[0]) == [
+            'id', 'title_id', 'text', 'author', 'score', 'pub_date',
+        ]
+        assert rows[0]['author'] == str(reviews[0].author_id)
+        assert rows[0]['pub_date'].endswith('Z')
+
+    def test_ndjson(self, admin_client, titles):
+        lines = export(admin_client, 'titles', 'ndjson').splitlines()
+        assert [json.loads(line) for line in lines][0] == {
+            'id': titles[0].id,
+            'name': titles[0].name,
+            'year': titles[0].year,
+            'category': titles[0].category_id,
+        }
+        assert len(lines) == len(titles)
+
+    def test_round_trip(self, admin_client, reviews, user, tmp_path):
+        reviews[0].comments.create(author=user, text='Комментарий, "с" ,')
+        tables = [table for table in TABLES if table is not USERS]
+        for table in tables:
+            (tmp_path / table.file).write_text(
+                export(admin_client, table.name), encoding='utf-8'
+            )
+        expected = {table: rows(table) for table in tables}
+        Category.objects.all().delete()
+        Genre.objects.all().delete()
+        Title.objects.all().delete()
+        TitleGenre.objects.all().delete()
+        Importer(str(tmp_path), batch_size=5).run(tables)
+        finish_import(tables)
+        for table, table_rows in expected.items():
+            assert rows(table) == table_rows, (
+                f'Проверьте, что importdb читает выгрузку {table.file}'
+            )
+
+    def test_access(self, client, user_client, admin_client):
+        assert client.get('/api/v1/export/titles/').status_code == 401
+        assert user_client.get('/api/v1/export/titles/').status_code == 403
+        assert admin_client.get('/api/v1/export/users/').status_code == 404
+        response = admin_client.get('/api/v1/export/titles/', {'fmt': 'xml'})
+        assert response.status_code == 400
@@ -0,0 +1,100 @@
+import datetime
+import decimal
+import uuid
+from collections import OrderedDict
+
+import pytest
+from django.utils import timezone
+from django.utils.translation import gettext_lazy
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from api.fastpath import FastListSerializer
+from api.renderers import FastJSONRenderer
+from api.serializers import (
+    CommentSerializer,
+    ReviewSerializer,
+    TitleSerializer,
+)
+from reviews.models import Comment, Review, Title
+
+
+def render_both(serializer_class, instances):
+    """Ответ быстрого пути и обычного ListSerializer + JSONRenderer."""
+    fast = serializer_class(instances, many=True)
+    assert isinstance(fast, FastListSerializer)
+    slow = serializers.ListSerializer(
+        instances, child=serializer_class()
+    )
+    return (
+        FastJSONRenderer().render(fast.data),
+        JSONRenderer().render(slow.data),
+    )
+
+
+@pytest.mark.django_db
+class TestFastListSerializer:
+
+    def test_titles(self, titles, reviews):
+        Title.objects.create(name='Без описания \u2028', year=2000)
+        instances = list(
+            Title.objects.select_related('category')
+            .prefetch_related('genre').order_by('id')
+        )
+        fast, slow = render_both(TitleSerializer, instances)
+        assert fast == slow, (
+            'Проверьте, что быстрый путь выдаёт тот же JSON для произведений'
+        )
+
+    def test_reviews_and_comments(self, reviews, user):
+        Comment.objects.create(
+            review=reviews[0], author=user, text='Комментарий "ё" \u2029'
+        )
+        instances = list(
+            Review.objects.select_related('author', 'title').order_by('id')
+        )
+        fast, slow = render_both(ReviewSerializer, instances)
+        assert fast == slow, (
+            'Проверьте, что быстрый путь выдаёт тот же JSON для отзывов'
+        )
+        instances = list(Comment.objects.select_related('author'))
+        fast, slow = render_both(CommentSerializer, instances)
+        assert fast == slow, (
+            'Проверьте, что быстрый путь выдаёт тот же JSON для комментариев'
+        )
+
+    @pytest.mark.parametrize('url', [
+        '/api/v1/titles/',
+        '/api/v1/titles/?cursor=',
+        '/api/v1/categories/',
+    ])
+    def test_response_bytes(self, client, titles, url):
+        response = client.get(url)
+        assert response.content == JSONRenderer().render(response.json()), (
+            'Проверьте, что ответ API совпадает с выводом JSONRenderer'
+        )
+
+
+class TestFastJSONRenderer:
+
+    @pytest.mark.parametrize('data', [
+        None,
+        [],
+        {'text': 'Строка "в кавычках" \\ \u2028\u2029\t\n', 'score': 10},
+        OrderedDict([('b', 1), ('a', [True, False, None])]),
+        {1: 'ключ-число', 'date': datetime.date(2022, 1, 31)},
+        {'pub_date': timezone.now(), 'time': datetime.time(12, 30, 1, 5000)},
+        {'id': uuid.uuid4(), 'value': decimal.Decimal('1.50')},
+        {'detail': gettext_lazy('Not found.')},
+        {'big': 2 ** 70},
+        [serializers.ErrorDetail('Ошибка', code='invalid')],
+    ])
+    def test_matches_json_renderer(self, data):
+        assert FastJSONRenderer().render(data) == JSONRenderer().render(data)
+
+    def test_indent_falls_back(self):
+        data = {'a': [1, 2]}
+        media_type = 'application/json; indent=4'
+        assert FastJSONRenderer().render(data, media_type) == (
+            JSONRenderer().render(data, media_type)
+        )
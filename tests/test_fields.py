@@ -0,0 +1,88 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+@pytest.mark.django_db
+class TestSparseFields:
+
+    def test_titles_list(self, client, titles, reviews):
+        url = '/api/v1/titles/?fields=id,name,rating'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(url)
+        assert response.status_code == 200
+        results = response.json()['results']
+        assert [list(item) for item in results] == (
+            [['id', 'rating', 'name']] * len(results)
+        ), 'Проверьте, что ?fields= оставляет в ответе только указанные поля'
+        assert results[-1]['rating'] == reviews[0].title.rating
+        # Количество и страница, без загрузки жанров.
+        assert len(context.captured_queries) == 2
+        page_sql = context.captured_queries[-1]['sql']
+        assert 'description' not in page_sql
+        assert 'reviews_category' not in page_sql
+
+    def test_titles_keyset_and_detail(self, client, titles):
+        response = client.get('/api/v1/titles/?cursor=&limit=2&fields=name')
+        assert response.status_code == 200
+        assert response.json()['results'] == [
+            {'name': titles[11].name},
+            {'name': titles[10].name},
+        ]
+        response = client.get(response.json()['next'])
+        assert response.json()['results'][0] == {'name': titles[9].name}
+        response = client.get(
+            f'/api/v1/titles/{titles[0].id}/?fields=category,genre'
+        )
+        assert response.json() == {
+            'genre': [
+                {'name': genre.name, 'slug': genre.slug}
+                for genre in titles[0].genre.all()
+            ],
+            'category': {
+                'name': titles[0].category.name,
+                'slug': titles[0].category.slug,
+            },
+        }
+
+    def test_without_fields(self, client, titles):
+        response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert list(response.json()) == [
+            'id', 'genre', 'category', 'description', 'rating', 'reviews_count',
+            'name', 'year',
+        ]
+
+    def test_unknown_field(self, client, titles):
+        response = client.get('/api/v1/titles/?fields=name,password')
+        assert response.status_code == 400, (
+            'Проверьте, что неизвестное поле в ?fields= возвращает 400'
+        )
+        assert 'fields' in response.json()
+
+    def test_reviews_and_comments(self, client, reviews, user):
+        review = reviews[0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/'
+        with CaptureQueriesContext(connection) as context:
+            response = client.get(f'{url}?fields=id,score')
+        assert response.json()['results'][0] == {
+            'id': review.id, 'score': review.score,
+        }
+        assert 'users_user' not in context.captured_queries[-1]['sql']
+        response = client.get(f'{url}?fields=author,title&limit=1')
+        assert response.json()['results'][0] == {
+            'title': review.title.name,
+            'author': review.author.username,
+        }
+        review.comments.create(author=user, text='Комментарий')
+        response = client.get(f'{url}{review.id}/comments/?fields=author')
+        assert response.json()['results'] == [{'author': user.username}]
+
+    def test_ignored_on_write(self, admin_client, categories, genres):
+        response = admin_client.post('/api/v1/titles/?fields=id', data={
+            'name': 'Новое',
+            'year': 2000,
+            'category': categories[0].slug,
+            'genre': [genres[0].slug],
+        })
+        assert response.status_code == 201
+        assert 'category' in response.json()
@@ -0,0 +1,23 @@
+import pytest
+
+
+@pytest.mark.django_db
+class TestTitleFilter:
+
+    def test_search(self, client, titles):
+        response = client.get('/api/v1/titles/?search=Описание 3')
+        assert response.status_code == 200
+        names = [item['name'] for item in response.json()['results']]
+        assert names == ['Произведение 3'], (
+            'Проверьте, что поиск ищет по названию и описанию произведения'
+        )
+
+    def test_slug_filters_are_exact(self, client, titles):
+        response = client.get('/api/v1/titles/?category=category-1')
+        assert response.json()['count'] == 4
+        response = client.get('/api/v1/titles/?category=category')
+        assert response.json()['count'] == 0, (
+            'Проверьте, что фильтр по slug категории ищет точное совпадение'
+        )
+        response = client.get('/api/v1/titles/?genre=genre-2')
+        assert response.json()['count'] == len(titles)
@@ -0,0 +1,137 @@
+import datetime
+import os
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+from reviews.csvdata import TABLES
+from reviews.models import (
+    Category,
+    Comment,
+    Genre,
+    Review,
+    Title,
+    TitleGenre,
+    User,
+)
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), 'fixtures', 'csv')
+
+# Строки со ссылками на несуществующие объекты пропускаются.
+EXPECTED_COUNTS = {
+    User: 3,
+    Category: 2,
+    Genre: 2,
+    Title: 3,
+    TitleGenre: 4,
+    Review: 3,
+    Comment: 3,
+}
+
+
+def import_data(engine='orm'):
+    call_command('importdb', data_dir=DATA_DIR, engine=engine, batch_size=2)
+
+
+@pytest.mark.django_db
+class TestImportDb:
+
+    def test_counts(self):
+        import_data()
+        assert {
+            model: model.objects.count() for model in EXPECTED_COUNTS
+        } == EXPECTED_COUNTS, (
+            'Проверьте, что importdb загружает все строки и пропускает '
+            'строки с несуществующими внешними ключами'
+        )
+        assert Title.objects.get(pk=3).category is None
+        assert User.objects.get(pk=102).bio == 'Пишет, "много"'
+        assert Review.objects.get(pk=1).pub_date == datetime.datetime(
+            2019, 9, 24, 21, 8, 21, 567000, tzinfo=timezone.utc
+        ), 'Проверьте, что importdb сохраняет даты из CSV'
+
+    def test_counters(self):
+        import_data()
+        title = Title.objects.get(pk=1)
+        assert (title.rating_sum, title.rating_count) == (17, 2), (
+            'Проверьте, что после импорта пересчитываются рейтинги'
+        )
+        assert Title.objects.get(pk=3).rating_count == 0
+        assert Review.objects.get(pk=1).comments_count == 2
+        assert Review.objects.get(pk=3).comments_count == 1
+
+    def test_sequences_after_import(self):
+        import_data()
+        title = Title.objects.create(name='Новое', year=2000)
+        user = User.objects.create(username='new', email='new@yamdb.fake')
+        review = Review.objects.create(
+            author=user, title=title, text='Отзыв', score=5
+        )
+        comment = Comment.objects.create(
+            author=user, review=review, text='Комментарий'
+        )
+        assert title.pk > 3 and review.pk > 3 and comment.pk > 3, (
+            'Проверьте, что importdb сдвигает последовательности '
+            'первичных ключей за импортированные значения'
+        )
+        assert user.pk > 102
+
+    def test_reimport_reports_no_inserted_rows(self, capsys):
+        import_data()
+        capsys.readouterr()
+        import_data()
+        output = capsys.readouterr().out
+        assert output.count('Вставлено строк: 0,') == len(TABLES), (
+            'Проверьте, что importdb считает вставленными только новые '
+            'строки'
+        )
+        assert 'уже были в базе: 3,' in output
+
+
+def snapshot():
+    rows = {
+        table.name: sorted(table.model.objects.values_list(
+            *[attname for column, attname in table.columns]
+        ))
+        for table in TABLES
+    }
+    rows['counters'] = (
+        sorted(Title.objects.values_list('id', 'rating_sum', 'rating_count')),
+        sorted(Review.objects.values_list('id', 'comments_count')),
+    )
+    return rows
+
+
+@pytest.mark.django_db(transaction=True)
+class TestCopyEngine:
+
+    def test_same_as_orm(self):
+        # На других СУБД copy сводится к ORM.
+        import_data()
+        expected = snapshot()
+        for model in reversed(list(EXPECTED_COUNTS)):
+            model.objects.all().delete()
+        import_data(engine='copy')
+        assert snapshot() == expected, (
+            'Проверьте, что importdb --engine copy загружает те же данные, '
+            'что и --engine orm'
+        )
+
+    @pytest.mark.skipif(
+        connection.vendor != 'postgresql',
+        reason='COPY есть только в PostgreSQL',
+    )
+    def test_copy_keeps_empty_fields(self, capsys):
+        import_data(engine='copy')
+        assert 'используется пакетный импорт' not in capsys.readouterr().out
+        assert {
+            model: model.objects.count() for model in EXPECTED_COUNTS
+        } == EXPECTED_COUNTS, (
+            'Проверьте, что importdb --engine copy не теряет строки с '
+            'пустыми полями'
+        )
+        user = User.objects.get(pk=100)
+        assert (user.bio, user.first_name, user.last_name) == ('', '', '')
+        assert Title.objects.get(pk=3).category is None
@@ -0,0 +1,109 @@
+import datetime
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from reviews import leaderboards
+from reviews.models import Review, Title, TitleRank
+
+
+def board_rows():
+    return sorted(TitleRank.objects.values_list(
+        'board', 'group_id', 'title_id', 'rating', 'reviews_count',
+    ).exclude(reviews_count=0))
+
+
+@pytest.fixture
+def rated(titles, reviews, user, moderator):
+    # titles[1] выше titles[0] по средней оценке, titles[2] без жанров.
+    Review.objects.create(author=user, title=titles[1], text='1', score=10)
+    Review.objects.create(author=moderator, title=titles[1], text='2', score=9)
+    Review.objects.create(author=user, title=titles[2], text='3', score=7)
+    titles[2].genre.clear()
+    return titles
+
+
+@pytest.mark.django_db
+class TestLeaderboards:
+
+    def test_top(self, client, rated):
+        response = client.get('/api/v1/titles/top/')
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()['results']] == [
+            rated[1].id, rated[2].id, rated[0].id,
+        ], 'Проверьте, что /titles/top/ упорядочен по средней оценке'
+        assert 'count' not in response.json()
+        category = rated[2].category.slug
+        response = client.get('/api/v1/titles/top/', {'category': category})
+        assert [item['id'] for item in response.json()['results']] == [
+            rated[2].id,
+        ]
+        genre = rated[0].genre.first().slug
+        response = client.get('/api/v1/titles/top/', {'genre': genre})
+        assert [item['id'] for item in response.json()['results']] == [
+            rated[1].id, rated[0].id,
+        ]
+
+    def test_pages(self, client, rated):
+        response = client.get('/api/v1/titles/top/', {'limit': 2})
+        assert len(response.json()['results']) == 2
+        response = client.get(response.json()['next'])
+        assert [item['id'] for item in response.json()['results']] == [
+            rated[0].id,
+        ]
+        assert response.json()['next'] is None
+
+    def test_weekly(self, client, rated):
+        Review.objects.filter(title=rated[0]).update(
+            pub_date=timezone.now() - datetime.timedelta(days=8)
+        )
+        Review.objects.filter(title=rated[0]).first().delete()
+        response = client.get('/api/v1/titles/weekly/')
+        assert [item['id'] for item in response.json()['results']][:2] == [
+            rated[0].id, rated[1].id,
+        ], 'Проверьте, что недельная таблица обновляется при новых отзывах'
+        call_command('rebuildleaderboards')
+        response = client.get('/api/v1/titles/weekly/')
+        assert [item['id'] for item in response.json()['results']] == [
+            rated[1].id, rated[2].id,
+        ], 'Проверьте, что пересборка убирает отзывы старше недели'
+
+    def test_incremental_matches_rebuild(self, user_client, rated, genres):
+        title = rated[3]
+        user_client.post(
+            f'/api/v1/titles/{title.id}/reviews/',
+            data={'text': 'Отзыв', 'score': 4},
+        )
+        review = Review.objects.get(title=rated[1], score=10)
+        review.score = 1
+        review.save()
+        rated[1].genre.remove(genres[0])
+        rated[0].category = None
+        rated[0].save()
+        Review.objects.get(title=rated[2]).delete()
+        rated[5].delete()
+        incremental = board_rows()
+        leaderboards.rebuild()
+        assert incremental == board_rows(), (
+            'Проверьте, что сигналы поддерживают таблицы лидеров '
+            'в том же состоянии, что и полная пересборка'
+        )
+
+    def test_title_delete_with_reviews(self, rated):
+        Title.objects.filter(pk=rated[0].pk).delete()
+        assert not TitleRank.objects.filter(title_id=rated[0].pk).exists()
+
+    @pytest.mark.parametrize('limit', [1, 10])
+    def test_queries(self, client, rated, django_assert_num_queries, limit):
+        # Страница таблицы, произведения и их жанры.
+        with django_assert_num_queries(3):
+            client.get('/api/v1/titles/top/', {'limit': limit})
+
+    def test_bad_params(self, client, rated):
+        response = client.get(
+            '/api/v1/titles/top/', {'genre': 'genre-0', 'category': 'x'}
+        )
+        assert response.status_code == 400
+        response = client.get('/api/v1/titles/top/', {'genre': 'unknown'})
+        assert response.status_code == 404
@@ -0,0 +1,81 @@
+import json
+
+import pytest
+from django.conf import settings
+from django.test import Client, override_settings
+
+from api_yamdb.metrics import AUTH_CACHE, registry
+from users.models import OutgoingEmail
+
+
+def metrics(**options):
+    return override_settings(METRICS={
+        **settings.METRICS, 'ENABLED': True, **options,
+    })
+
+
+def parse_samples(text):
+    samples = {}
+    for line in text.splitlines():
+        if line and not line.startswith('#'):
+            sample, value = line.rsplit(' ', 1)
+            samples[sample] = float(value)
+    return samples
+
+
+@pytest.mark.django_db
+class TestMetrics:
+
+    def test_disabled(self, client):
+        assert client.get('/metrics').status_code == 404
+
+    def test_requests(self, titles, user):
+        OutgoingEmail.objects.enqueue(user)
+        with metrics():
+            client = Client()
+            before = parse_samples(client.get('/metrics').content.decode())
+            client.get('/api/v1/titles/')
+            client.get('/api/v1/titles/0/')
+            response = client.get('/metrics')
+        assert response['Content-Type'].startswith('text/plain')
+        samples = parse_samples(response.content.decode())
+
+        def delta(sample):
+            return samples[sample] - before.get(sample, 0)
+
+        list_labels = 'view="titles-list",method="GET"'
+        assert delta(
+            f'http_requests_total{{{list_labels},status="200"}}'
+        ) == 1, 'Проверьте, что запросы считаются по вьюхам и статусам'
+        assert delta(
+            'http_requests_total'
+            '{view="titles-detail",method="GET",status="404"}'
+        ) == 1
+        assert delta(
+            f'http_request_duration_seconds_bucket{{{list_labels},le="+Inf"}}'
+        ) == 1
+        assert delta(f'http_request_duration_seconds_count{{{list_labels}}}') == 1
+        assert delta('db_queries_total{view="titles-list"}') == 3
+        assert samples['email_queue_depth'] == 1
+
+    def test_auth_cache(self, user_client):
+        user_client.get('/api/v1/users/me/')
+        before = dict(AUTH_CACHE.values)
+        user_client.get('/api/v1/users/me/')
+        assert AUTH_CACHE.values[('hit',)] == before.get(('hit',), 0) + 1, (
+            'Проверьте, что попадания в кэш пользователей считаются'
+        )
+
+    def test_workers_aggregated(self, client, tmp_path):
+        # Снимок другого воркера уже лежит в каталоге.
+        other = {'auth_user_cache_requests_total': [[['miss'], 1000]]}
+        (tmp_path / '1.json').write_text(json.dumps(other))
+        with metrics(DIR=str(tmp_path)):
+            response = Client().get('/metrics')
+        samples = parse_samples(response.content.decode())
+        own = AUTH_CACHE.values.get(('miss',), 0)
+        assert samples[
+            'auth_user_cache_requests_total{result="miss"}'
+        ] == own + 1000, 'Проверьте, что метрики воркеров складываются'
+        assert len(list(tmp_path.glob('*.json'))) == 2
+        assert registry.flushed_at
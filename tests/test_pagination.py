@@ -0,0 +1,68 @@
+import json
+from base64 import urlsafe_b64encode
+
+import pytest
+
+
+def walk(client, url, link):
+    ids = []
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        data = response.json()
+        assert 'count' not in data, (
+            'Проверьте, что курсорная пагинация не считает количество записей'
+        )
+        ids.extend(item['id'] for item in data['results'])
+        url = data[link]
+    return ids
+
+
+@pytest.mark.django_db
+class TestKeysetPagination:
+
+    def test_reviews_cursor(self, client, reviews):
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/'
+        expected = [review.id for review in reviews]
+        assert walk(client, f'{url}?cursor=&limit=5', 'next') == expected
+        response = client.get(f'{url}?cursor=&limit=5').json()
+        assert response['previous'] is None
+        last = client.get(
+            client.get(response['next']).json()['next']
+        ).json()
+        assert [item['id'] for item in last['results']] == expected[10:]
+        assert walk(client, last['previous'], 'previous') == (
+            expected[5:10] + expected[:5]
+        )
+
+    def test_titles_cursor(self, client, titles):
+        ids = walk(client, '/api/v1/titles/?cursor=&limit=5', 'next')
+        assert ids == [title.id for title in reversed(titles)]
+
+    def test_limit_offset_by_default(self, client, titles):
+        response = client.get('/api/v1/titles/?limit=5&offset=5')
+        assert response.json()['count'] == len(titles)
+
+    def test_invalid_cursor(self, client, titles):
+        response = client.get('/api/v1/titles/?cursor=garbage')
+        assert response.status_code == 404
+
+    @pytest.mark.parametrize('position', (['год', 1], [2000, {'id': 1}]))
+    def test_cursor_with_wrong_types(self, client, titles, position):
+        cursor = urlsafe_b64encode(
+            json.dumps({'p': position, 'r': False}).encode()
+        ).decode()
+        response = client.get(f'/api/v1/titles/?cursor={cursor}')
+        assert response.status_code == 404, (
+            'Проверьте, что курсор со значениями неподходящих типов '
+            'возвращает 404'
+        )
+
+    def test_reviews_cursor_with_wrong_date(self, client, reviews):
+        cursor = urlsafe_b64encode(
+            json.dumps({'p': ['вчера', 1], 'r': True}).encode()
+        ).decode()
+        response = client.get(
+            f'/api/v1/titles/{reviews[0].title_id}/reviews/?cursor={cursor}'
+        )
+        assert response.status_code == 404
@@ -0,0 +1,37 @@
+import pytest
+from rest_framework.test import APIClient
+
+
+@pytest.mark.django_db
+class TestReviewPermissions:
+
+    def url(self, review):
+        return f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+
+    def test_author_can_edit(self, reviews):
+        review = reviews[0]
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Bearer {review.author.token}')
+        response = client.patch(self.url(review), data={'text': 'Правка'})
+        assert response.status_code == 200
+
+    def test_other_user_cannot_edit(self, reviews, user_client):
+        response = user_client.patch(self.url(reviews[0]), data={'text': 'x'})
+        assert response.status_code == 403
+
+    def test_moderator_can_delete(self, reviews, moderator_client):
+        response = moderator_client.delete(self.url(reviews[0]))
+        assert response.status_code == 204
+
+    def test_anonymous_read_only(self, reviews, client):
+        assert client.get(self.url(reviews[0])).status_code == 200
+        assert client.delete(self.url(reviews[0])).status_code == 401
+
+    def test_object_check_does_not_load_author(
+        self, reviews, user_client, django_assert_num_queries
+    ):
+        user_client.get('/api/v1/users/me/')
+        # Отзыв с произведением и автором загружается одним запросом.
+        with django_assert_num_queries(1):
+            response = user_client.delete(self.url(reviews[0]))
+        assert response.status_code == 403
@@ -0,0 +1,62 @@
+import json
+import logging
+
+import pytest
+from django.conf import settings
+from django.test import Client, override_settings
+
+
+def profiling(**options):
+    return override_settings(API_PROFILING={
+        **settings.API_PROFILING, 'ENABLED': True, **options,
+    })
+
+
+def parse_server_timing(header):
+    metrics = {}
+    for metric in header.split(', '):
+        name, *params = metric.split(';')
+        metrics[name] = dict(param.split('=', 1) for param in params)
+    return metrics
+
+
+@pytest.mark.django_db
+class TestProfiling:
+
+    def test_disabled(self, client, titles):
+        response = client.get('/api/v1/titles/')
+        assert 'Server-Timing' not in response, (
+            'Проверьте, что без API_PROFILING middleware отключён'
+        )
+
+    def test_server_timing(self, titles, caplog):
+        with profiling(), caplog.at_level(logging.INFO, 'api.profiling'):
+            response = Client().get('/api/v1/titles/')
+        assert response.status_code == 200
+        metrics = parse_server_timing(response['Server-Timing'])
+        assert set(metrics) == {'db', 'view', 'render', 'total'}, (
+            'Проверьте, что Server-Timing содержит время по фазам'
+        )
+        assert metrics['db']['desc'] == '"3 queries"'
+        record = json.loads(caplog.records[-1].getMessage())
+        assert record['view'] == 'titles-list'
+        assert record['queries'] == 3
+        assert record['size'] == len(response.content)
+        assert not record['over_budget']
+        assert caplog.records[-1].levelno == logging.INFO
+
+    def test_query_budget(self, titles, caplog):
+        budgets = {'titles-list': 1}
+        with profiling(BUDGETS=budgets, HEADER=False):
+            with caplog.at_level(logging.INFO, 'api.profiling'):
+                response = Client().get('/api/v1/titles/')
+                Client().get('/api/v1/genres/')
+        assert 'Server-Timing' not in response
+        over, within = [
+            json.loads(record.getMessage()) for record in caplog.records
+        ]
+        assert over['over_budget'] and over['query_budget'] == 1, (
+            'Проверьте, что запросы сверх бюджета отмечаются в логе'
+        )
+        assert caplog.records[0].levelno == logging.WARNING
+        assert not within['over_budget']
@@ -0,0 +1,370 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.management import call_command
+from django.db import IntegrityError, connection
+from django.test.utils import CaptureQueriesContext
+
+from reviews.models import Review, Title
+
+TRANSACTION_STATEMENTS = ('SAVEPOINT', 'RELEASE SAVEPOINT', 'ROLLBACK TO')
+
+
+def run_counting_queries(request):
+    with CaptureQueriesContext(connection) as context:
+        response = request()
+    queries = [
+        query['sql'] for query in context.captured_queries
+        if not query['sql'].startswith(TRANSACTION_STATEMENTS)
+    ]
+    return response, queries
+
+
+@pytest.mark.django_db
+class TestTitleQueries:
+
+    @pytest.mark.parametrize('limit', [1, 10])
+    def test_titles_list(self, client, titles, django_assert_num_queries, limit):
+        with django_assert_num_queries(3):
+            response = client.get(f'/api/v1/titles/?limit={limit}')
+        assert response.status_code == 200
+        assert len(response.json()['results']) == limit, (
+            'Проверьте, что список произведений поддерживает пагинацию'
+        )
+
+    def test_titles_detail(self, client, titles, django_assert_num_queries):
+        with django_assert_num_queries(2):
+            response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert response.status_code == 200
+        assert len(response.json()['genre']) == 3
+
+
+@pytest.mark.django_db
+class TestAuthQueries:
+
+    def test_authenticated_user_is_cached(self, user_client, django_assert_num_queries):
+        with django_assert_num_queries(1):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.status_code == 200
+        with django_assert_num_queries(0):
+            response = user_client.get('/api/v1/users/me/')
+        assert response.json()['username'] == 'TestUser'
+
+    def test_user_change_invalidates_cache(self, user, user_client):
+        user_client.get('/api/v1/users/me/')
+        user.role = 'moderator'
+        user.save()
+        response = user_client.get('/api/v1/users/me/')
+        assert response.json()['role'] == 'moderator', (
+            'Проверьте, что изменение пользователя сбрасывает кэш аутентификации'
+        )
+
+
+@pytest.mark.django_db
+class TestResponseCache:
+
+    def test_anonymous_titles_are_cached(self, client, titles, django_assert_num_queries):
+        client.get('/api/v1/titles/')
+        with django_assert_num_queries(0):
+            response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == len(titles)
+
+    def test_write_invalidates_cache(self, client, admin_client, titles):
+        client.get('/api/v1/titles/')
+        response = admin_client.delete(f'/api/v1/titles/{titles[0].id}/')
+        assert response.status_code == 204
+        response = client.get('/api/v1/titles/')
+        assert response.json()['count'] == len(titles) - 1, (
+            'Проверьте, что изменение произведений сбрасывает кэш списка'
+        )
+
+    def test_review_write_invalidates_only_its_title(
+        self, client, user_client, titles, django_assert_num_queries
+    ):
+        client.get(f'/api/v1/titles/{titles[1].id}/reviews/')
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0].id}/reviews/',
+            data={'text': 'Отзыв', 'score': 8},
+        )
+        assert response.status_code == 201
+        with django_assert_num_queries(0):
+            client.get(f'/api/v1/titles/{titles[1].id}/reviews/')
+        response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert response.json()['rating'] == 8
+
+    def test_user_delete_invalidates_reviewed_titles(
+        self, client, user_client, admin_client, user, titles
+    ):
+        response = user_client.post(
+            f'/api/v1/titles/{titles[0].id}/reviews/',
+            data={'text': 'Отзыв', 'score': 8},
+        )
+        assert response.status_code == 201
+        assert client.get(f'/api/v1/titles/{titles[0].id}/').json()[
+            'rating'
+        ] == 8
+        list_url = f'/api/v1/titles/?limit={len(titles)}'
+        client.get(list_url)
+        response = admin_client.delete(f'/api/v1/users/{user.username}/')
+        assert response.status_code == 204
+        response = client.get(f'/api/v1/titles/{titles[0].id}/')
+        assert response.json()['rating'] is None, (
+            'Проверьте, что удаление пользователя сбрасывает кэш '
+            'произведений, на которые он оставлял отзывы'
+        )
+        ratings = {
+            item['id']: item['rating']
+            for item in client.get(list_url).json()['results']
+        }
+        assert ratings[titles[0].id] is None
+
+    def test_list_only_viewsets_have_no_detail_route(self, client, categories):
+        # Кэширующий mixin не должен добавлять маршрут retrieve.
+        response = client.get(f'/api/v1/categories/{categories[0].slug}/')
+        assert response.status_code == 405
+        response = client.get('/api/v1/genres/genre-0/')
+        assert response.status_code == 405
+
+
+@pytest.mark.django_db
+class TestConditionalGet:
+
+    def test_etag_not_modified(self, user_client, titles, django_assert_num_queries):
+        url = f'/api/v1/titles/{titles[0].id}/'
+        response = user_client.get(url)
+        etag = response['ETag']
+        assert etag and response.has_header('Last-Modified')
+        with django_assert_num_queries(0):
+            response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 304
+        assert response['ETag'] == etag
+
+    def test_etag_changes_after_write(self, client, user_client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/reviews/'
+        etag = client.get(url)['ETag']
+        user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response['ETag'] != etag
+        assert len(response.json()['results']) == 1
+
+    def test_orm_save_changes_etag(self, client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/'
+        etag = client.get(url)['ETag']
+        title = titles[0]
+        title.name = 'Изменено в админке'
+        title.save()
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что изменение через ORM меняет ETag'
+        )
+        assert response.json()['name'] == 'Изменено в админке'
+
+    def test_rebuild_command_changes_etag(self, client, titles, reviews):
+        url = f'/api/v1/titles/{titles[0].id}/'
+        response = client.get(url)
+        etag = response['ETag']
+        Title.objects.filter(pk=titles[0].id).update(rating_sum=0)
+        call_command('rebuildratings')
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200, (
+            'Проверьте, что команды пересчёта меняют ETag'
+        )
+
+    def test_comment_updates_review_comments_count(
+        self, client, user_client, reviews
+    ):
+        review = reviews[0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/'
+        response = client.get(url)
+        assert response.json()['comments_count'] == 0
+        etag = response['ETag']
+        response = user_client.post(
+            f'{url}comments/', data={'text': 'Комментарий'}
+        )
+        assert response.status_code == 201
+        assert client.get(url).json()['comments_count'] == 1, (
+            'Проверьте, что комментарий сбрасывает кэш отзыва'
+        )
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == 200
+        assert response.json()['comments_count'] == 1
+
+
+@pytest.mark.django_db
+class TestAuthFlowQueries:
+
+    def test_signup_new_user(self, client):
+        response, queries = run_counting_queries(lambda: client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'newbie', 'email': 'newbie@yamdb.fake'},
+        ))
+        assert response.status_code == 200
+        assert len(queries) == 3, queries
+
+    def test_signup_existing_user(self, client, user):
+        response, queries = run_counting_queries(lambda: client.post(
+            '/api/v1/auth/signup/',
+            data={'username': user.username, 'email': user.email},
+        ))
+        assert response.status_code == 200
+        assert len(queries) == 2, queries
+
+    def test_signup_conflict(self, client, user):
+        response, queries = run_counting_queries(lambda: client.post(
+            '/api/v1/auth/signup/',
+            data={'username': user.username, 'email': 'other@yamdb.fake'},
+        ))
+        assert response.status_code == 400
+        assert len(queries) == 1, queries
+
+    def test_token(self, client, user):
+        code = default_token_generator.make_token(user)
+        response, queries = run_counting_queries(lambda: client.post(
+            '/api/v1/auth/token/',
+            data={'username': user.username, 'confirmation_code': code},
+        ))
+        assert response.status_code == 201
+        assert len(queries) == 1, queries
+
+    def test_admin_creates_user(self, admin_client):
+        admin_client.get('/api/v1/users/me/')
+        data = {'username': 'created', 'email': 'created@yamdb.fake'}
+        response, queries = run_counting_queries(
+            lambda: admin_client.post('/api/v1/users/', data=data)
+        )
+        assert response.status_code == 201
+        assert len(queries) == 1, queries
+        response, queries = run_counting_queries(
+            lambda: admin_client.post('/api/v1/users/', data=data)
+        )
+        assert response.status_code == 400, (
+            'Проверьте, что повторное создание пользователя возвращает 400'
+        )
+        assert len(queries) == 1, queries
+
+    def test_admin_updates_user(self, admin_client, user):
+        admin_client.get('/api/v1/users/me/')
+        response, queries = run_counting_queries(lambda: admin_client.patch(
+            f'/api/v1/users/{user.username}/',
+            data={'role': 'moderator'},
+        ))
+        assert response.status_code == 200
+        assert len(queries) == 2, queries
+
+    def test_me_update(self, user_client):
+        user_client.get('/api/v1/users/me/')
+        response, queries = run_counting_queries(lambda: user_client.patch(
+            '/api/v1/users/me/',
+            data={'bio': 'Новое описание'},
+        ))
+        assert response.status_code == 200
+        assert len(queries) == 2, queries
+
+
+@pytest.mark.django_db
+class TestNestedRouteQueries:
+
+    @pytest.mark.parametrize('limit', [1, 10])
+    def test_reviews_list(self, client, reviews, django_assert_num_queries, limit):
+        url = f'/api/v1/titles/{reviews[0].title_id}/reviews/?limit={limit}'
+        with django_assert_num_queries(2):
+            response = client.get(url)
+        assert len(response.json()['results']) == limit
+
+    def test_empty_or_missing_parent(self, client, titles, reviews):
+        response = client.get(f'/api/v1/titles/{titles[1].id}/reviews/')
+        assert response.status_code == 200
+        assert response.json()['results'] == []
+        response = client.get('/api/v1/titles/0/reviews/')
+        assert response.status_code == 404
+        response = client.get(
+            f'/api/v1/titles/{titles[1].id}/reviews/{reviews[0].id}/comments/'
+        )
+        assert response.status_code == 404, (
+            'Проверьте, что комментарии отзыва другого произведения недоступны'
+        )
+
+    def test_review_create(self, user_client, moderator_client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/reviews/'
+        user_client.get('/api/v1/users/me/')
+        response, queries = run_counting_queries(
+            lambda: user_client.post(url, data={'text': 'Отзыв', 'score': 5})
+        )
+        assert response.status_code == 201
+        assert response.json()['title'] == titles[0].name
+        # Первый отзыв: у произведения ещё нет строк таблиц лидеров, и
+        # после пустых UPDATE общие таблицы пересобираются (чтение
+        # произведения с жанрами, удаление, вставка), а в недельную
+        # вставляется строка: на 4 запроса больше.
+        assert len(queries) == 9, queries
+        moderator_client.get('/api/v1/users/me/')
+        response, queries = run_counting_queries(lambda: moderator_client.post(
+            url, data={'text': 'Второй', 'score': 7}
+        ))
+        assert response.status_code == 201
+        # Произведение, вставка отзыва, обновление рейтинга, таблиц
+        # лидеров и недельной таблицы.
+        assert len(queries) == 5, queries
+        response = user_client.post(url, data={'text': 'Ещё', 'score': 1})
+        assert response.status_code == 400, (
+            'Проверьте, что повторный отзыв на произведение запрещён'
+        )
+
+    def test_review_create_keeps_other_integrity_errors(
+        self, user_client, titles, monkeypatch
+    ):
+        def fail(*args, **kwargs):
+            raise IntegrityError('CHECK constraint failed')
+
+        monkeypatch.setattr(Review, 'save', fail)
+        with pytest.raises(IntegrityError):
+            user_client.post(
+                f'/api/v1/titles/{titles[0].id}/reviews/',
+                data={'text': 'Отзыв', 'score': 5},
+            )
+
+    def test_comment_create(self, user_client, reviews):
+        review = reviews[0]
+        url = f'/api/v1/titles/{review.title_id}/reviews/{review.id}/comments/'
+        user_client.get('/api/v1/users/me/')
+        response, queries = run_counting_queries(
+            lambda: user_client.post(url, data={'text': 'Комментарий'})
+        )
+        assert response.status_code == 201
+        # Отзыв, вставка комментария и счётчик комментариев отзыва.
+        assert len(queries) == 3, queries
+        with CaptureQueriesContext(connection) as context:
+            response = user_client.get(url)
+        assert len(response.json()['results']) == 1
+        assert len(context.captured_queries) == 2
+
+
+@pytest.mark.django_db
+class TestTitleBatch:
+    url = '/api/v1/titles/batch/'
+
+    @pytest.mark.parametrize('count', [1, 12])
+    def test_fixed_queries(self, client, titles, django_assert_num_queries,
+                           count):
+        ids = [title.id for title in reversed(titles[:count])]
+        with django_assert_num_queries(2):
+            response = client.get(
+                self.url, {'ids': ','.join(map(str, ids + ids[:1] + [0]))}
+            )
+        assert response.status_code == 200
+        assert [item['id'] for item in response.json()] == ids, (
+            'Проверьте, что batch возвращает произведения в порядке ids '
+            'без повторов и несуществующих id'
+        )
+        detail = client.get(f'/api/v1/titles/{ids[0]}/').json()
+        assert response.json()[0] == detail
+
+    def test_fields(self, client, titles):
+        response = client.get(self.url, {'ids': titles[0].id, 'fields': 'name'})
+        assert response.json() == [{'name': titles[0].name}]
+
+    @pytest.mark.parametrize('ids', ['', 'a,1', ','.join(map(str, range(101)))])
+    def test_invalid_ids(self, client, ids):
+        response = client.get(self.url, {'ids': ids})
+        assert response.status_code == 400
+        assert 'ids' in response.json()
@@ -0,0 +1,143 @@
+"""Количество запросов к базе для каждого маршрута DefaultRouter.
+
+Каждый маршрут вызывается анонимно, пользователем и администратором
+на двух объёмах данных. Количество запросов не должно зависеть от
+объёма данных (и размера страницы) и не должно превышать бюджет из
+query_budgets.json; новый маршрут без бюджета тоже считается ошибкой.
+"""
+import json
+import os
+import re
+
+import pytest
+from django.core.management import call_command
+
+from api.urls import router
+from tests.test_queries import run_counting_queries
+from users.models import User
+
+BUDGETS_FILE = os.path.join(os.path.dirname(__file__), 'query_budgets.json')
+
+with open(BUDGETS_FILE, encoding='utf-8') as file:
+    BUDGETS = json.load(file)
+
+# Меньше и больше размера страницы по умолчанию.
+SIZES = (3, 12)
+
+ACTIONS = (
+    ('list', 'get', False),
+    ('retrieve', 'get', True),
+    ('create', 'post', False),
+)
+
+CALLERS = ('anon', 'user', 'admin')
+
+URL_KWARGS = {'title_id': 1, 'review_id': 1}
+
+# Объекты из generatedata: первичные ключи начинаются с 1.
+DETAIL_LOOKUPS = {
+    'user': 'bench1',
+    'titles': 1,
+    'reviews': 1,
+    'comments': 1,
+}
+
+CREATE_DATA = {
+    'user': {'username': 'created', 'email': 'created@yamdb.fake'},
+    'categories': {'name': 'Новая категория', 'slug': 'created'},
+    'genres': {'name': 'Новый жанр', 'slug': 'created'},
+    'titles': {
+        'name': 'Новое произведение',
+        'year': 2000,
+        'category': 'category-1',
+        'genre': ['genre-1', 'genre-2'],
+    },
+    'reviews': {'text': 'Новый отзыв', 'score': 7},
+    'comments': {'text': 'Новый комментарий'},
+}
+
+
+def routes():
+    for prefix, viewset, basename in router.registry:
+        for action, method, detail in ACTIONS:
+            if hasattr(viewset, action):
+                for caller in CALLERS:
+                    yield pytest.param(
+                        prefix, basename, action, method, detail, caller,
+                        id=f'{basename}-{action}-{caller}',
+                    )
+
+
+def expected_status(basename, action, caller):
+    admin_only = basename == 'user' or (
+        action == 'create' and basename in ('categories', 'genres', 'titles')
+    )
+    if caller == 'anon' and (admin_only or action == 'create'):
+        return 401
+    if caller == 'user' and admin_only:
+        return 403
+    return 201 if action == 'create' else 200
+
+
+def make_url(prefix, basename, detail):
+    path = re.sub(
+        r'\(\?P<(\w+)>[^)]*\)',
+        lambda match: str(URL_KWARGS[match.group(1)]),
+        prefix,
+    )
+    url = f'/api/v1/{path}/'
+    if detail:
+        url += f'{DETAIL_LOOKUPS[basename]}/'
+    return url
+
+
+def count_queries(client, method, url, data, size, status):
+    # Все отзывы за последнюю неделю: у каждого произведения есть строка
+    # недельной таблицы лидеров при любом объёме.
+    call_command(
+        'generatedata', titles=size, genres=size, categories=size,
+        users=size, reviews=size, comments=size, days=1, clear=True,
+    )
+    # generatedata --clear не удаляет пользователя, созданного прошлым
+    # прогоном.
+    User.objects.filter(username=CREATE_DATA['user']['username']).delete()
+    # Пользователь аутентифицирован заранее, его загрузка не считается.
+    client.get('/api/v1/users/me/')
+    response, queries = run_counting_queries(
+        lambda: getattr(client, method)(url, data=data, format='json')
+    )
+    assert response.status_code == status, response.content
+    return queries
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    'prefix, basename, action, method, detail, caller', list(routes())
+)
+def test_query_budget(request, prefix, basename, action, method, detail,
+                      caller):
+    client = request.getfixturevalue(
+        'client' if caller == 'anon' else f'{caller}_client'
+    )
+    url = make_url(prefix, basename, detail)
+    data = CREATE_DATA[basename] if action == 'create' else None
+    status = expected_status(basename, action, caller)
+    small, large = (
+        count_queries(client, method, url, data, size, status)
+        for size in SIZES
+    )
+    assert len(small) == len(large), (
+        f'Проверьте {method.upper()} {url}: количество запросов растёт '
+        f'с объёмом данных ({len(small)} -> {len(large)})\n'
+        + '\n'.join(large)
+    )
+    budget = BUDGETS.get(basename, {}).get(action, {}).get(caller)
+    assert budget is not None, (
+        f'Добавьте в query_budgets.json бюджет {basename}.{action}.{caller}, '
+        f'сейчас запросов: {len(large)}'
+    )
+    assert len(large) <= budget, (
+        f'Проверьте {method.upper()} {url} ({caller}): {len(large)} '
+        f'запросов при бюджете {budget}\n' + '\n'.join(large)
+    )
+
@@ -0,0 +1,90 @@
+import pytest
+from django.core.management import call_command
+from django.db.models import Count, Sum
+
+from reviews.models import Review, Title
+
+
+def stored(title):
+    title = Title.objects.get(pk=title.pk)
+    return title.rating_sum, title.rating_count
+
+
+def aggregated(title):
+    values = Review.objects.filter(title=title).aggregate(
+        total=Sum('score'), count=Count('pk'),
+    )
+    return values['total'] or 0, values['count']
+
+
+@pytest.mark.django_db
+class TestRatingCounters:
+
+    def test_create(self, user, moderator, titles):
+        Review.objects.create(author=user, title=titles[0], text='1', score=4)
+        Review.objects.create(
+            author=moderator, title=titles[0], text='2', score=9
+        )
+        assert stored(titles[0]) == (13, 2), (
+            'Проверьте, что создание отзыва обновляет rating_sum '
+            'и rating_count произведения'
+        )
+        assert Title.objects.get(pk=titles[0].pk).rating == 6
+
+    def test_score_change(self, user, titles):
+        review = Review.objects.create(
+            author=user, title=titles[0], text='1', score=4
+        )
+        review.score = 10
+        review.save()
+        review = Review.objects.get(pk=review.pk)
+        review.score = 7
+        review.save()
+        assert stored(titles[0]) == (7, 1), (
+            'Проверьте, что изменение оценки обновляет rating_sum'
+        )
+
+    def test_delete(self, user, moderator, titles):
+        Review.objects.create(author=user, title=titles[0], text='1', score=4)
+        review = Review.objects.create(
+            author=moderator, title=titles[0], text='2', score=9
+        )
+        review.delete()
+        Review.objects.get(author=user).delete()
+        assert stored(titles[0]) == (0, 0), (
+            'Проверьте, что удаление отзыва уменьшает счётчики рейтинга'
+        )
+        assert Title.objects.get(pk=titles[0].pk).rating is None
+
+    def test_move(self, user, titles):
+        review = Review.objects.create(
+            author=user, title=titles[0], text='1', score=6
+        )
+        review = Review.objects.get(pk=review.pk)
+        review.title = titles[1]
+        review.save()
+        assert stored(titles[0]) == (0, 0)
+        assert stored(titles[1]) == (6, 1), (
+            'Проверьте, что перенос отзыва переносит оценку '
+            'на другое произведение'
+        )
+
+    def test_api_writes(self, user_client, titles):
+        url = f'/api/v1/titles/{titles[0].id}/reviews/'
+        review_id = user_client.post(
+            url, data={'text': 'Отзыв', 'score': 3}
+        ).json()['id']
+        user_client.patch(f'{url}{review_id}/', data={'score': 8})
+        assert stored(titles[0]) == (8, 1)
+        user_client.delete(f'{url}{review_id}/')
+        assert stored(titles[0]) == (0, 0)
+
+    def test_rebuildratings(self, reviews, titles):
+        title = reviews[0].title
+        expected = aggregated(title)
+        Title.objects.update(rating_sum=1000, rating_count=1)
+        call_command('rebuildratings')
+        assert stored(title) == expected, (
+            'Проверьте, что rebuildratings пересчитывает рейтинги по отзывам'
+        )
+        assert stored(titles[1]) == (0, 0)
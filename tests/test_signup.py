@@ -0,0 +1,75 @@
+import pytest
+from django.contrib.auth.tokens import default_token_generator
+from django.core.mail import EmailMessage
+from django.core.mail.backends.locmem import EmailBackend
+from django.core.management import call_command
+
+from users.models import OutgoingEmail, User
+
+
+@pytest.mark.django_db
+class TestSignUpOutbox:
+
+    signup = {'username': 'newbie', 'email': 'newbie@yamdb.fake'}
+
+    def test_signup_queues_email(self, client, mailoutbox):
+        response = client.post('/api/v1/auth/signup/', data=self.signup)
+        assert response.status_code == 200
+        assert len(mailoutbox) == 0, (
+            'Проверьте, что письмо не отправляется во время запроса'
+        )
+        assert OutgoingEmail.objects.count() == 1
+
+    def test_repeated_signup_is_deduplicated(self, client):
+        client.post('/api/v1/auth/signup/', data=self.signup)
+        client.post('/api/v1/auth/signup/', data=self.signup)
+        assert OutgoingEmail.objects.count() == 1
+
+    def test_worker_sends_queued_email(self, client, mailoutbox):
+        client.post('/api/v1/auth/signup/', data=self.signup)
+        call_command('sendemails', '--once')
+        assert len(mailoutbox) == 1
+        user = User.objects.get(username='newbie')
+        assert mailoutbox[0].to == [user.email]
+        assert default_token_generator.check_token(user, mailoutbox[0].body)
+        assert OutgoingEmail.objects.get().sent_at is not None
+        call_command('sendemails', '--once')
+        assert len(mailoutbox) == 1
+
+    def test_failed_email_is_retried_later(self, client, mailoutbox, monkeypatch):
+        client.post('/api/v1/auth/signup/', data=self.signup)
+
+        def fail(message):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailMessage, 'send', fail)
+        call_command('sendemails', '--once')
+        email = OutgoingEmail.objects.get()
+        assert email.sent_at is None
+        assert email.attempts == 1
+        assert 'SMTP' in email.last_error
+        assert not OutgoingEmail.objects.due().exists()
+
+    def test_connection_error_fails_whole_batch(
+        self, client, mailoutbox, monkeypatch
+    ):
+        client.post('/api/v1/auth/signup/', data=self.signup)
+        client.post(
+            '/api/v1/auth/signup/',
+            data={'username': 'second', 'email': 'second@yamdb.fake'},
+        )
+
+        def fail(backend):
+            raise ConnectionError('SMTP недоступен')
+
+        monkeypatch.setattr(EmailBackend, 'open', fail, raising=False)
+        call_command('sendemails', '--once')
+        assert len(mailoutbox) == 0
+        for email in OutgoingEmail.objects.all():
+            assert email.sent_at is None
+            assert email.attempts == 1, (
+                'Проверьте, что ошибка соединения засчитывается всем '
+                'письмам пачки'
+            )
+            assert 'SMTP' in email.last_error
+        assert not OutgoingEmail.objects.due().exists()